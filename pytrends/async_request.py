@@ -0,0 +1,162 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from pytrends.request import ExploreResult, TrendReq
+
+
+class AsyncTrendReq(object):
+    """
+    Google Trends API for asyncio
+
+    Exposes the same methods as `TrendReq` as coroutines. Requests are sent by
+    an underlying `TrendReq` (available as `self.trendreq`) on a bounded pool
+    of workers, so independent widget requests, like the one-per-keyword
+    requests of `related_queries` and `related_topics`, run concurrently.
+    """
+
+    def __init__(self, *args, max_concurrency=5, **kwargs):
+        """
+        Initialize default values for params
+
+        `max_concurrency` bounds the number of requests in flight at once, all
+        other arguments are passed along to `TrendReq`.
+        """
+        self.max_concurrency = max_concurrency
+        kwargs.setdefault('pool_maxsize', max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.trendreq = TrendReq(*args, **kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop the workers and close the underlying client"""
+        self._executor.shutdown(wait=False)
+        self.trendreq.close()
+
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking `TrendReq` call on the worker pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(func, *args, **kwargs))
+
+    async def build_payload(self, kw_list, cat=0, timeframe='today 5-y', geo='',
+                            gprop=''):
+        """Create the payload for related queries, interest over time and interest by region"""
+        return await self._run(self.trendreq.build_payload, kw_list, cat=cat,
+                               timeframe=timeframe, geo=geo, gprop=gprop)
+
+    async def build_query(self, kw_list, cat=0, timeframe='today 5-y', geo='',
+                          gprop=''):
+        """Create the payload for related queries, interest over time and interest by region and return it as a `Query`"""
+        return await self._run(self.trendreq.build_query, kw_list, cat=cat,
+                               timeframe=timeframe, geo=geo, gprop=gprop)
+
+    async def interest_over_time(self, dtype='int64', output='pandas', query=None):
+        """Request data from Google's Interest Over Time section and return a dataframe"""
+        return await self._run(self.trendreq.interest_over_time, dtype=dtype, output=output,
+                               query=query)
+
+    async def multirange_interest_over_time(self, tidy=False, dtype='int64', query=None):
+        """Request data from Google's Interest Over Time section across different time ranges and return a dataframe"""
+        return await self._run(self.trendreq.multirange_interest_over_time,
+                               tidy=tidy, dtype=dtype, query=query)
+
+    async def interest_by_region(self, resolution='COUNTRY', inc_low_vol=False,
+                                 inc_geo_code=False, dtype='int64', output='pandas',
+                                 query=None):
+        """Request data from Google's Interest by Region section and return a dataframe"""
+        return await self._run(self.trendreq.interest_by_region,
+                               resolution=resolution, inc_low_vol=inc_low_vol,
+                               inc_geo_code=inc_geo_code, dtype=dtype, output=output,
+                               query=query)
+
+    async def related_topics(self, output='pandas', query=None):
+        """Request data from Google's Related Topics section and return a dictionary of dataframes
+
+        The widget of every keyword is requested concurrently.
+        """
+        query = query or self.trendreq._current_query()
+        results = await asyncio.gather(*(
+            self._run(self.trendreq._related_topics, request_json, output=output)
+            for request_json in query.related_topics_widget_list
+        ))
+        return dict(results)
+
+    async def related_queries(self, output='pandas', query=None):
+        """Request data from Google's Related Queries section and return a dictionary of dataframes
+
+        The widget of every keyword is requested concurrently.
+        """
+        query = query or self.trendreq._current_query()
+        results = await asyncio.gather(*(
+            self._run(self.trendreq._related_queries, request_json, output=output)
+            for request_json in query.related_queries_widget_list
+        ))
+        return dict(results)
+
+    async def explore_all(self, resolution='COUNTRY', inc_low_vol=False, inc_geo_code=False,
+                          dtype='int64', output='pandas', query=None):
+        """Request every section of a payload at once and return them as an `ExploreResult`
+
+        All the widgets are requested concurrently, a section whose widget Google didn't return is None.
+        """
+        query = query or self.trendreq._current_query()
+        over_time = None
+        if query.interest_over_time_widget:
+            over_time = self.interest_over_time(dtype=dtype, output=output, query=query)
+        by_region = None
+        if query.interest_by_region_widget:
+            by_region = self.interest_by_region(
+                resolution=resolution, inc_low_vol=inc_low_vol, inc_geo_code=inc_geo_code,
+                dtype=dtype, output=output, query=query)
+        results = await asyncio.gather(
+            over_time or asyncio.sleep(0),
+            by_region or asyncio.sleep(0),
+            self.related_topics(output=output, query=query),
+            self.related_queries(output=output, query=query),
+        )
+        return ExploreResult(*results)
+
+    async def trending_searches(self, pn='united_states', output='pandas'):
+        """Request data from Google's Hot Searches section and return a dataframe"""
+        return await self._run(self.trendreq.trending_searches, pn=pn, output=output)
+
+    async def today_searches(self, pn='US', output='pandas'):
+        """Request data from Google Daily Trends section and returns a dataframe"""
+        return await self._run(self.trendreq.today_searches, pn=pn, output=output)
+
+    async def realtime_trending_searches(self, pn='US', cat='all', count=300,
+                                         output='pandas'):
+        """Request data from Google Realtime Search Trends section and returns a dataframe"""
+        return await self._run(self.trendreq.realtime_trending_searches,
+                               pn=pn, cat=cat, count=count, output=output)
+
+    async def top_charts(self, date, hl='en-US', tz=300, geo='GLOBAL', output='pandas'):
+        """Request data from Google's Top Charts section and return a dataframe"""
+        return await self._run(self.trendreq.top_charts, date, hl=hl, tz=tz,
+                               geo=geo, output=output)
+
+    async def suggestions(self, keyword):
+        """Request data from Google's Keyword Suggestion dropdown and return a dictionary"""
+        return await self._run(self.trendreq.suggestions, keyword)
+
+    async def suggestions_many(self, keywords, limit=1, output='pandas'):
+        """Request the suggestions of many keywords and return them as a single table
+
+        Every distinct keyword is requested concurrently.
+        """
+        return await self._run(self.trendreq.suggestions_many, keywords, limit=limit,
+                               max_workers=self.max_concurrency, output=output)
+
+    async def categories(self):
+        """Request available categories data from Google's API and return a dictionary"""
+        return await self._run(self.trendreq.categories)
+
+    async def category_index(self):
+        """Return the category tree as a `pytrends.categories.CategoryIndex`, built once per language"""
+        return await self._run(self.trendreq.category_index)
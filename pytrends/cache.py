@@ -0,0 +1,292 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def payload_key(payload):
+    """Return a canonical hash of a request payload
+
+    JSON encoded values (like the 'req' parameter) are decoded first so that the key doesn't depend on
+    the order of their keys.
+    """
+    canonical = dict()
+    for name, value in payload.items():
+        if isinstance(value, str) and value[:1] in ('{', '['):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        canonical[name] = value
+    encoded = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+class TTLCache(object):
+    """
+    In-memory LRU cache whose entries expire `ttl` seconds after being set
+
+    Holds up to `maxsize` entries, evicting the least recently used one when full.
+    A single cache can be shared by many threads.
+    """
+
+    def __init__(self, maxsize=256, ttl=300, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Return the value stored for `key`, or `default` if it is missing or expired"""
+        with self._lock:
+            try:
+                expires, value = self._entries[key]
+            except KeyError:
+                return default
+            if expires <= self._timer():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store `value` for `key`"""
+        with self._lock:
+            self._entries[key] = (self._timer() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+
+
+class ResponseCache(object):
+    """
+    Base class of the persistent caches of widget data responses
+
+    Responses are keyed by url and parameters, leaving out the token which changes on every payload.
+    How long a response is kept depends on the timeframe it was requested for, see `ResponseCache.TTL`;
+    pass `ttl` to override some of them. Once the stored responses exceed `max_size` bytes the least
+    recently used ones are evicted. Subclasses implement the storage.
+    """
+    # seconds a response is kept for, by kind of timeframe:
+    # - historical: explicit date ranges that ended before today, these never change
+    # - rolling: ranges relative to today ('today 5-y', 'all') or that include today
+    # - realtime: ranges relative to the current time ('now 1-H', 'now 7-d'), which Google resolves to
+    #   hourly ranges ending today ('2023-03-19T10 2023-03-26T10') with a resolution under a day
+    # - reference: keyword suggestions and the category tree, which have no timeframe and seldom change
+    TTL = {
+        'historical': 30 * 24 * 60 * 60,
+        'rolling': 60 * 60,
+        'realtime': 60,
+        'reference': 7 * 24 * 60 * 60,
+    }
+    # resolutions Google picks for the interest over time of ranges shorter than a week
+    REALTIME_RESOLUTIONS = ('MINUTE', 'EIGHT_MINUTE', 'HOUR')
+
+    def __init__(self, ttl=None, max_size=100 * 1024 * 1024, timer=time.time):
+        self.ttls = dict(ResponseCache.TTL, **(ttl or {}))
+        self.max_size = max_size
+        self._timer = timer
+
+    @staticmethod
+    def key(url, params):
+        """Return the key of the response of `url` requested with `params`"""
+        params = {name: value for name, value in params.items() if name != 'token'}
+        return payload_key(dict(params, url=url))
+
+    def ttl(self, params):
+        """Return the seconds the response to a request with `params` can be kept for"""
+        # suggestions and categories are the only cached requests without a widget request
+        if 'req' not in params:
+            return self.ttls['reference']
+        try:
+            request = json.loads(params.get('req', '{}'))
+        except (TypeError, ValueError):
+            request = {}
+        kinds = [_timeframe_kind(timeframe) for timeframe in _find_timeframes(request)]
+        if not kinds:
+            return self.ttls['rolling']
+        if isinstance(request, dict) and request.get('resolution') in ResponseCache.REALTIME_RESOLUTIONS:
+            # minutes or hours of data that aren't over yet
+            kinds = ['realtime' if kind == 'rolling' else kind for kind in kinds]
+        # a request is only as stable as its least stable timeframe
+        return min(self.ttls[kind] for kind in kinds)
+
+    def get(self, key):
+        """Return the response stored for `key`, or None if it is missing or expired"""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Store the response `value` for `key` during `ttl` seconds"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every stored response"""
+        raise NotImplementedError
+
+
+def _find_timeframes(request):
+    """Yield every timeframe found in a widget request"""
+    if isinstance(request, dict):
+        for name, value in request.items():
+            if name == 'time' and isinstance(value, str):
+                yield value
+            else:
+                yield from _find_timeframes(value)
+    elif isinstance(request, list):
+        for value in request:
+            yield from _find_timeframes(value)
+
+
+def _timeframe_kind(timeframe):
+    """Classify a timeframe as 'historical', 'rolling' or 'realtime'"""
+    if timeframe.startswith('now'):
+        return 'realtime'
+    try:
+        end = timeframe.split(' ')[1]
+        end_date = datetime.strptime(end[:10], '%Y-%m-%d').date()
+    except (IndexError, ValueError):
+        return 'rolling'
+    # Google uses UTC dates
+    if end_date < datetime.now(timezone.utc).date():
+        return 'historical'
+    # an hourly range that includes today is how Google sends the 'now' timeframes
+    if 'T' in end:
+        return 'realtime'
+    return 'rolling'
+
+
+class SQLiteCache(ResponseCache):
+    """
+    Response cache stored in a SQLite database at `path`
+
+    The database can be shared by several processes.
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, value TEXT, size INTEGER, expires REAL, accessed REAL)')
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        now = self._timer()
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT value FROM responses WHERE key = ? AND expires > ?', (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def set(self, key, value, ttl):
+        now = self._timer()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                (key, value, len(value.encode('utf-8')), now + ttl, now))
+            conn.execute('DELETE FROM responses WHERE expires <= ?', (now,))
+            # evict the least recently used responses until the cache fits in max_size
+            total, = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()
+            if total > self.max_size:
+                rows = conn.execute('SELECT key, size FROM responses ORDER BY accessed').fetchall()
+                evicted = []
+                for row_key, size in rows:
+                    if total <= self.max_size:
+                        break
+                    evicted.append((row_key, ))
+                    total -= size
+                conn.executemany('DELETE FROM responses WHERE key = ?', evicted)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM responses')
+
+
+class FileCache(ResponseCache):
+    """
+    Response cache stored as one file per response in `directory`
+    """
+
+    def __init__(self, directory, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry['expires'] <= self._timer():
+            _remove(path)
+            return None
+        # the modification time tracks when the response was last used
+        os.utime(path)
+        return entry['value']
+
+    def set(self, key, value, ttl):
+        path = self._path(key)
+        # write to a temporary file first so readers never see a partial response
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'expires': self._timer() + ttl, 'value': value}, f)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        """Remove the least recently used responses until the cache fits in max_size"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            _remove(path)
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                _remove(entry.path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
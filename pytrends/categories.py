@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+# a category of the tree: `parent` is None for the root, `children` are ids and
+# `path` holds the ids from the root down to the category itself
+Category = namedtuple('Category', ['id', 'name', 'parent', 'children', 'path'])
+
+
+class CategoryIndex(object):
+    """
+    Lookup tables of the category tree returned by `TrendReq.categories`
+
+    Categories are found by id (`index[cat]`, `cat in index`) or by name
+    (`index.ids(name)`, case insensitive, a name can be used by several
+    categories) in constant time, without walking the tree.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._categories = dict()
+        self._names = dict()
+        # iterative walk, from the root down
+        pending = [(tree, None, ())]
+        while pending:
+            node, parent, path = pending.pop()
+            path = path + (node['id'], )
+            children = node.get('children', ())
+            # a few categories are found under several parents, the first one is kept
+            if node['id'] not in self._categories:
+                self._categories[node['id']] = Category(
+                    id=node['id'],
+                    name=node['name'],
+                    parent=parent,
+                    children=tuple(child['id'] for child in children),
+                    path=path,
+                )
+                key = node['name'].casefold()
+                self._names[key] = self._names.get(key, ()) + (node['id'], )
+            pending.extend((child, node['id'], path) for child in reversed(children))
+
+    def __getitem__(self, cat):
+        return self._categories[cat]
+
+    def __contains__(self, cat):
+        return cat in self._categories
+
+    def __iter__(self):
+        return iter(self._categories.values())
+
+    def __len__(self):
+        return len(self._categories)
+
+    @property
+    def root(self):
+        """The 'All categories' category"""
+        return self._categories[self.tree['id']]
+
+    def ids(self, name):
+        """Return the ids of the categories called `name`, in tree order"""
+        return self._names.get(name.casefold(), ())
+
+    def parent(self, cat):
+        """Return the parent category of `cat`, None for the root"""
+        parent = self._categories[cat].parent
+        return None if parent is None else self._categories[parent]
+
+    def children(self, cat):
+        """Return the direct subcategories of `cat`"""
+        return [self._categories[child] for child in self._categories[cat].children]
+
+    def path(self, cat):
+        """Return the categories from the root down to `cat`"""
+        return [self._categories[ancestor] for ancestor in self._categories[cat].path]
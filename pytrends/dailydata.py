@@ -1,12 +1,17 @@
 from datetime import date, timedelta
 from functools import partial
+import os
+import threading
 from time import sleep
 from calendar import monthrange
+from typing import Iterator, List, Optional, Union
 
 import pandas as pd
 
+from pytrends.cache import payload_key
 from pytrends.exceptions import ResponseError
-from pytrends.request import TrendReq
+from pytrends.ratelimit import RateLimiter
+from pytrends.request import TrendReq, _bounded_map
 
 
 def get_last_date_of_month(year: int, month: int) -> date:
@@ -26,33 +31,135 @@ def convert_dates_to_timeframe(start: date, stop: date) -> str:
     return f"{start.strftime('%Y-%m-%d')} {stop.strftime('%Y-%m-%d')}"
 
 
-def _fetch_data(pytrends, build_payload, timeframe: str) -> pd.DataFrame:
-    """Attempts to fecth data and retries in case of a ResponseError."""
-    attempts, fetched = 0, False
-    while not fetched:
+def _fetch_data(pytrends: TrendReq,
+                words: List[str],
+                geo: str,
+                timeframe: str,
+                checkpoint_dir: Optional[str] = None,
+                retries: int = 3) -> pd.DataFrame:
+    """Fetches the interest over time of words and retries in case of a
+    ResponseError, raising it again once all the retries failed.
+
+    With a checkpoint_dir, data fetched by a previous run is read from it and
+    newly fetched data is saved to it, unless some of it is partial.
+    """
+    path = None
+    if checkpoint_dir is not None:
+        key = payload_key({'words': words, 'geo': geo, 'timeframe': timeframe})
+        path = os.path.join(checkpoint_dir, f'{key}.pkl')
+        if os.path.exists(path):
+            return pd.read_pickle(path)
+
+    attempts = 0
+    while True:
         try:
-            build_payload(timeframe=timeframe)
+            _, df = pytrends._payload_interest_over_time(
+                {'kw_list': words, 'timeframe': timeframe, 'geo': geo})
+            break
         except ResponseError as err:
+            if attempts >= retries:
+                raise
             print(err)
             print(f'Trying again in {60 + 5 * attempts} seconds.')
             sleep(60 + 5 * attempts)
             attempts += 1
-            if attempts > 3:
-                print('Failed after 3 attemps, abort fetching.')
-                break
-        else:
-            fetched = True
-    return pytrends.interest_over_time()
 
+    # data that isn't final yet (the current month, or a range ending in it) must be requested again next time,
+    # and so must a month without any data which may only be missing for now
+    if path is not None and 'isPartial' in df and not df['isPartial'].any():
+        # write to a temporary file first so an interrupted run never leaves a partial month
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+    return df
+
+
+def iter_daily_data(word: Union[str, List[str]],
+                    start_year: int,
+                    start_mon: int,
+                    stop_year: int,
+                    stop_mon: int,
+                    geo: str = 'US',
+                    verbose: bool = True,
+                    wait_time: float = 5.0,
+                    max_workers: int = 4,
+                    checkpoint_dir: Optional[str] = None,
+                    retries: int = 3) -> Iterator[pd.DataFrame]:
+    """Same as get_daily_data, but yields the scaled daily data of each month
+    as soon as it is fetched instead of returning them all at the end.
+
+    Only the monthly data and the months being fetched are kept in memory, so
+    long time frames can be written to storage month by month. Concatenating
+    every yielded DataFrame gives the result of get_daily_data.
+
+    Yields:
+        (pd.DataFrame): The daily data of a single month, with the columns
+            described in get_daily_data.
+    """
+    words = [word] if isinstance(word, str) else list(word)
+
+    # Set up start and stop dates
+    start_date = date(start_year, start_mon, 1) 
+    stop_date = get_last_date_of_month(stop_year, stop_mon)
+
+    # Start pytrends for US region, each month takes two requests
+    rate_limiter = RateLimiter(2 / wait_time) if wait_time > 0 else None
+    pytrends = TrendReq(hl='en-US', tz=360, rate_limiter=rate_limiter)
+    if checkpoint_dir is not None:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+    fetch = partial(_fetch_data, pytrends, words, geo,
+                    checkpoint_dir=checkpoint_dir, retries=retries)
+
+    # Obtain monthly data for all months in years [start_year, stop_year]
+    monthly = fetch(convert_dates_to_timeframe(start_date, stop_date))
+
+    def timeframes():
+        current = start_date
+        while current < stop_date:
+            last_date_of_month = get_last_date_of_month(current.year, current.month)
+            yield convert_dates_to_timeframe(current, last_date_of_month)
+            current = last_date_of_month + timedelta(days=1)
 
-def get_daily_data(word: str,
+    def fetch_month(timeframe):
+        if verbose:
+            print(f'{",".join(words)}:{timeframe}')
+        return fetch(timeframe)
+
+    # Get daily data, month by month, fetching up to max_workers months at once
+    # last monthly value of each word, carried over to the next month until a new one is found
+    last_monthly = dict()
+    for daily in _bounded_map(fetch_month, timeframes(), max_workers):
+        # Google returns no data at all for some months, they are left out like in the monthly data
+        if daily.empty:
+            continue
+        complete = daily.drop(columns=['isPartial']).join(
+            monthly, lsuffix='_unscaled', rsuffix='_monthly')
+
+        # Scale daily data by monthly weights so the data is comparable
+        for w in words:
+            monthly_column = f'{w}_monthly'
+            scale_column = 'scale' if isinstance(word, str) else f'{w}_scale'
+            if w in last_monthly and pd.isna(complete[monthly_column].iloc[0]):
+                complete.loc[complete.index[0], monthly_column] = last_monthly[w]
+            complete[monthly_column] = complete[monthly_column].ffill()  # fill NaN values
+            last_monthly[w] = complete[monthly_column].iloc[-1]
+            complete[scale_column] = complete[monthly_column] / 100
+            complete[w] = complete[f'{w}_unscaled'] * complete[scale_column]
+
+        yield complete
+
+
+def get_daily_data(word: Union[str, List[str]],
                  start_year: int,
                  start_mon: int,
                  stop_year: int,
                  stop_mon: int,
                  geo: str = 'US',
                  verbose: bool = True,
-                 wait_time: float = 5.0) -> pd.DataFrame:
+                 wait_time: float = 5.0,
+                 max_workers: int = 4,
+                 checkpoint_dir: Optional[str] = None,
+                 retries: int = 3) -> pd.DataFrame:
     """Given a word, fetches daily search volume data from Google Trends and
     returns results in a pandas DataFrame.
 
@@ -65,8 +172,13 @@ def get_daily_data(word: str,
     value by the monthly search volume divided by 100.
     For a more detailed explanation see http://bit.ly/trendsscaling
 
+    Months are fetched concurrently, and with a checkpoint_dir every fetched
+    month is saved to disk so that an interrupted run resumes where it
+    stopped when called again with the same arguments.
+
     Args:
-        word (str): Word to fetch daily data for.
+        word (str or list): Word to fetch daily data for, or a list of up to
+            5 words sharing the same requests.
         start_year (int): the start year
         start_mon (int): start 1st day of the month
         stop_year (int): the end year
@@ -74,6 +186,12 @@ def get_daily_data(word: str,
         geo (str): geolocation
         verbose (bool): If True, then prints the word and current time frame
             we are fecthing the data for.
+        wait_time (float): Seconds between two months, the requests of all
+            the workers are throttled to one every wait_time / 2 seconds.
+        max_workers (int): Number of months fetched at once.
+        checkpoint_dir (str): Directory where the fetched data is saved.
+        retries (int): Number of times a request is retried after a
+            ResponseError before raising it.
 
     Returns:
         complete (pd.DataFrame): Contains 4 columns.
@@ -87,41 +205,11 @@ def get_daily_data(word: str,
             so that there are no NaN present.
             The column 'scale' contains the scale used to obtain the scaled
             daily data.
+            With a list of words, there are 4 columns for each word and the
+            scale column is named f'{word}_scale'.
     """
 
-    # Set up start and stop dates
-    start_date = date(start_year, start_mon, 1) 
-    stop_date = get_last_date_of_month(stop_year, stop_mon)
-
-    # Start pytrends for US region
-    pytrends = TrendReq(hl='en-US', tz=360)
-    # Initialize build_payload with the word we need data for
-    build_payload = partial(pytrends.build_payload,
-                            kw_list=[word], cat=0, geo=geo, gprop='')
-
-    # Obtain monthly data for all months in years [start_year, stop_year]
-    monthly = _fetch_data(pytrends, build_payload,
-                         convert_dates_to_timeframe(start_date, stop_date))
-
-    # Get daily data, month by month
-    results = {}
-    # if a timeout or too many requests error occur we need to adjust wait time
-    current = start_date
-    while current < stop_date:
-        last_date_of_month = get_last_date_of_month(current.year, current.month)
-        timeframe = convert_dates_to_timeframe(current, last_date_of_month)
-        if verbose:
-            print(f'{word}:{timeframe}')
-        results[current] = _fetch_data(pytrends, build_payload, timeframe)
-        current = last_date_of_month + timedelta(days=1)
-        sleep(wait_time)  # don't go too fast or Google will send 429s
-
-    daily = pd.concat(results.values()).drop(columns=['isPartial'])
-    complete = daily.join(monthly, lsuffix='_unscaled', rsuffix='_monthly')
-
-    # Scale daily data by monthly weights so the data is comparable
-    complete[f'{word}_monthly'].ffill(inplace=True)  # fill NaN values
-    complete['scale'] = complete[f'{word}_monthly'] / 100
-    complete[word] = complete[f'{word}_unscaled'] * complete.scale
-
-    return complete
+    return pd.concat(iter_daily_data(word, start_year, start_mon, stop_year, stop_mon,
+                                     geo=geo, verbose=verbose, wait_time=wait_time,
+                                     max_workers=max_workers, checkpoint_dir=checkpoint_dir,
+                                     retries=retries))
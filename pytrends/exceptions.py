@@ -15,3 +15,13 @@ class ResponseError(Exception):
 class TooManyRequestsError(ResponseError):
     """ Exception raised when the backend returns a 429 error code. """
     pass
+
+
+class NoProxyAvailableError(Exception):
+    """ Exception raised when every proxy of the pool is quarantined. """
+    pass
+
+
+class DeadlineExceededError(Exception):
+    """ Exception raised when Google didn't answer a request before its deadline. """
+    pass
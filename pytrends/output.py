@@ -0,0 +1,79 @@
+# formats results can be returned in:
+# - 'pandas': a DataFrame (or Series), the default of every method
+# - 'records': a list of dictionaries, one per row
+# - 'numpy': a dictionary of 1-D numpy arrays, one per column
+# - 'arrow': a pyarrow Table (requires `pip install pytrends[arrow]`)
+OUTPUTS = ('pandas', 'records', 'numpy', 'arrow')
+
+
+def check_output(output):
+    """Raise a ValueError if `output` is not a supported format"""
+    if output not in OUTPUTS:
+        raise ValueError(f'output must be one of {", ".join(OUTPUTS)}, not {output!r}')
+
+
+def _array(values):
+    """Return `values` as a 1-D numpy array, using objects for nested or mixed values"""
+    import numpy as np
+
+    if isinstance(values, np.ndarray):
+        return values
+    try:
+        array = np.array(values)
+    except ValueError:
+        array = None
+    if array is None or array.ndim != 1:
+        # lists of lists would become a 2-D array
+        array = np.empty(len(values), dtype=object)
+        for i, value in enumerate(values):
+            array[i] = value
+    return array
+
+
+def _values(values):
+    """Return `values` as a list of Python objects"""
+    if hasattr(values, 'tolist'):
+        if values.dtype.kind == 'M':
+            # nanosecond timestamps would become integers
+            values = values.astype('datetime64[us]')
+        return values.tolist()
+    return list(values)
+
+
+def columns_output(columns, output):
+    """Convert a dictionary of columns (lists or numpy arrays) into `output`, which isn't 'pandas'"""
+    if output == 'numpy':
+        return {name: _array(values) for name, values in columns.items()}
+    if output == 'records':
+        names = list(columns)
+        rows = zip(*(_values(values) for values in columns.values()))
+        return [dict(zip(names, row)) for row in rows]
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("output='arrow' needs the pyarrow package: pip install pytrends[arrow]")
+    return pa.table({name: values if hasattr(values, 'dtype') else list(values)
+                     for name, values in columns.items()})
+
+
+def records_output(records, output):
+    """Convert a list of dictionaries into `output`, which isn't 'pandas'"""
+    if output == 'records':
+        return records
+    # columns in order of appearance, missing values are None
+    names = dict()
+    for record in records:
+        names.update(dict.fromkeys(record))
+    columns = {name: [record.get(name) for record in records] for name in names}
+    return columns_output(columns, output)
+
+
+def flatten(record, sep='_', prefix=''):
+    """Flatten the nested dictionaries of `record` the way `pandas.json_normalize` does"""
+    flat = dict()
+    for name, value in record.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, sep=sep, prefix=f'{prefix}{name}{sep}'))
+        else:
+            flat[f'{prefix}{name}'] = value
+    return flat
@@ -0,0 +1,71 @@
+from collections import namedtuple
+from functools import partial
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from pytrends.request import TrendReq, _bounded_map
+
+# a single interest over time query: one keyword in one region over one timeframe
+QuerySpec = namedtuple('QuerySpec', ['keyword', 'geo', 'timeframe', 'cat', 'gprop'],
+                       defaults=('', 'today 5-y', 0, ''))
+
+
+def plan_payloads(specs: Iterable[QuerySpec]) -> List[List[QuerySpec]]:
+    """Packs query specs into the fewest explore payloads.
+
+    Duplicated specs are only requested once. A payload holds up to
+    TrendReq.MAX_KEYWORDS comparison items, which must share their category
+    and property (both are set for the whole payload) and their timeframe
+    (so that they get the same resolution). Keywords and regions can be
+    mixed freely.
+    """
+    groups = dict()
+    for spec in dict.fromkeys(QuerySpec(*spec) for spec in specs):
+        groups.setdefault((spec.cat, spec.gprop, spec.timeframe), []).append(spec)
+    return [group[i:i + TrendReq.MAX_KEYWORDS]
+            for group in groups.values()
+            for i in range(0, len(group), TrendReq.MAX_KEYWORDS)]
+
+
+def _fetch_payload(pytrends: TrendReq, payload: List[QuerySpec], dtype: str) -> Dict[QuerySpec, pd.DataFrame]:
+    """Requests the interest over time of a payload and splits it into one DataFrame per spec."""
+    first = payload[0]
+    items = [{'keyword': spec.keyword, 'time': spec.timeframe, 'geo': spec.geo} for spec in payload]
+    token_payload = pytrends._comparison_payload(items, cat=first.cat, gprop=first.gprop)
+    widget = pytrends._widgets(token_payload)['interest_over_time']
+    # columns are named by the position of their item in the payload
+    df = pytrends._interest_over_time(widget, range(len(payload)), [''], dtype=dtype)
+    if df.empty:
+        return {spec: df for spec in payload}
+    return {
+        spec: df[[index, 'isPartial']].rename(columns={index: spec.keyword})
+        for index, spec in enumerate(payload)
+    }
+
+
+def get_interest_over_time(specs: Iterable[QuerySpec],
+                           pytrends: Optional[TrendReq] = None,
+                           max_workers: int = 4,
+                           dtype: str = 'int64') -> Dict[QuerySpec, pd.DataFrame]:
+    """Fetches the interest over time of many query specs with as few
+    requests as possible.
+
+    The specs are packed into payloads (see plan_payloads) requested by
+    max_workers threads of `pytrends` (a new TrendReq by default), and the
+    results are scattered back to each spec.
+
+    Google scales every payload on its own: the values of specs packed into
+    the same payload are comparable with each other, but they are not scaled
+    so that each spec reaches 100 like a query of its own would be.
+
+    Returns:
+        (dict): A DataFrame for each distinct spec, with a column named after
+            its keyword and an 'isPartial' column, indexed by date.
+    """
+    pytrends = pytrends or TrendReq()
+    results = dict()
+    fetch = partial(_fetch_payload, pytrends, dtype=dtype)
+    for payload_results in _bounded_map(fetch, plan_payloads(specs), max_workers):
+        results.update(payload_results)
+    return results
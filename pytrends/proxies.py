@@ -0,0 +1,156 @@
+import threading
+import time
+
+from pytrends import exceptions
+
+
+class _ProxyHealth(object):
+    """Health statistics of a single proxy"""
+
+    def __init__(self):
+        # smoothed latency in seconds, None until a request succeeds
+        self.latency = None
+        # smoothed share of failed requests
+        self.failure_rate = 0.0
+        self.consecutive_failures = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.quarantined_until = 0.0
+
+
+class ProxyPool(object):
+    """
+    Thread-safe pool of https proxies that picks the healthiest one for each request
+
+    Every proxy tracks its latency, failure rate and number of requests in
+    flight. `acquire` returns the proxy with the lowest expected cost (latency
+    weighted by load and failure rate), spreading requests on ties. A
+    proxy whose request fails or gets a 429 is quarantined for `cooldown`
+    seconds, doubling on consecutive failures up to `max_cooldown`; once the
+    quarantine is over a single probe request is let through, and the proxy
+    rejoins the pool when it succeeds. Meanwhile `acquire` can wait for the
+    first proxy to come back instead of failing.
+    """
+
+    def __init__(self, proxies=(), cooldown=60, max_cooldown=900, smoothing=0.2):
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.smoothing = smoothing
+        self._health = dict()
+        self._lock = threading.Lock()
+        # notified whenever a proxy may have become available
+        self._available = threading.Condition(self._lock)
+        for proxy in proxies:
+            self.add(proxy)
+
+    def __len__(self):
+        return len(self._health)
+
+    def __iter__(self):
+        return iter(list(self._health))
+
+    def add(self, proxy):
+        """Add `proxy` to the pool"""
+        with self._lock:
+            self._health.setdefault(proxy, _ProxyHealth())
+            self._available.notify_all()
+
+    def remove(self, proxy):
+        """Remove `proxy` from the pool"""
+        with self._lock:
+            self._health.pop(proxy, None)
+
+    def _cost(self, health, default_latency):
+        latency = health.latency if health.latency is not None else default_latency
+        return latency * (1 + health.in_flight) / max(1 - health.failure_rate, 0.05)
+
+    def acquire(self, exclude=(), timeout=0):
+        """Pick the healthiest proxy, not in `exclude`, and count a request in flight on it
+
+        When every proxy is quarantined or probed, waits up to `timeout` seconds (forever with None) for the
+        first one to come back, then raises `NoProxyAvailableError`.
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                proxy = self._pick(exclude, now)
+                if proxy is not None:
+                    health = self._health[proxy]
+                    health.in_flight += 1
+                    health.requests += 1
+                    return proxy
+                # wake up when the earliest quarantine ends, or when a probe request is released
+                quarantines = [health.quarantined_until for proxy, health in self._health.items()
+                               if proxy not in exclude and health.quarantined_until > now]
+                wake_up = min(quarantines, default=None)
+                if end is not None and (wake_up is None or wake_up > end):
+                    wake_up = end
+                usable = any(proxy not in exclude for proxy in self._health)
+                if not usable or wake_up is not None and wake_up <= now:
+                    raise exceptions.NoProxyAvailableError('Every proxy is quarantined or busy')
+                self._available.wait(None if wake_up is None else wake_up - now)
+
+    def _pick(self, exclude, now):
+        """Return the available proxy with the lowest cost, or None"""
+        # unmeasured proxies are assumed to be as fast as the fastest one
+        latencies = [health.latency for health in self._health.values()
+                     if health.latency is not None]
+        default_latency = min(latencies, default=1.0)
+        candidates = [
+            (self._cost(health, default_latency), health.requests, proxy)
+            for proxy, health in self._health.items()
+            if proxy not in exclude and health.quarantined_until <= now
+            # a proxy coming back from quarantine gets a single probe request
+            and not (health.consecutive_failures and health.in_flight)
+        ]
+        if not candidates:
+            return None
+        # on equal cost the proxy with fewer requests wins, so every proxy gets measured
+        return min(candidates)[2]
+
+    def release(self, proxy, latency=None, error=None):
+        """Record the outcome of a request sent through `proxy`
+
+        `error` is None on success, 'throttled' after a 429 or 'failed' for any other failure.
+        """
+        with self._lock:
+            health = self._health.get(proxy)
+            if health is None:
+                return
+            health.in_flight = max(0, health.in_flight - 1)
+            self._available.notify_all()
+            failed = 1.0 if error else 0.0
+            health.failure_rate += self.smoothing * (failed - health.failure_rate)
+            if error is None:
+                health.consecutive_failures = 0
+                health.quarantined_until = 0.0
+                if latency is not None:
+                    if health.latency is None:
+                        health.latency = latency
+                    else:
+                        health.latency += self.smoothing * (latency - health.latency)
+                return
+            if error == 'throttled':
+                health.throttled += 1
+            health.consecutive_failures += 1
+            cooldown = min(self.max_cooldown,
+                           self.cooldown * 2 ** (health.consecutive_failures - 1))
+            health.quarantined_until = time.monotonic() + cooldown
+
+    def stats(self):
+        """Return the health statistics of every proxy, keyed by proxy"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                proxy: {
+                    'latency': health.latency,
+                    'failure_rate': health.failure_rate,
+                    'in_flight': health.in_flight,
+                    'requests': health.requests,
+                    'throttled': health.throttled,
+                    'quarantined_for': max(0.0, health.quarantined_until - now),
+                }
+                for proxy, health in self._health.items()
+            }
@@ -0,0 +1,223 @@
+from contextlib import contextmanager
+import sqlite3
+import threading
+import time
+
+
+class _TokenBucket(object):
+    """Token bucket refilled at `rate` tokens per second, holding up to `burst` tokens"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def update_rate(self, update, drain=False):
+        """Replace the refill rate with `update(rate)`, optionally dropping the tokens saved so far"""
+        with self._lock:
+            self._refill()
+            self.rate = update(self.rate)
+            if drain:
+                self._tokens = min(self._tokens, 0)
+
+
+class RateLimiter(object):
+    """
+    Token bucket rate limiter
+
+    Lets through `rate` requests per second on average, with bursts of up to
+    `burst` requests. Requests are limited separately for each key (proxy or
+    host) they are acquired for. A single limiter can be shared by many threads
+    and `TrendReq` instances.
+    """
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError('rate must be a positive number of requests per second')
+        self.rate = rate
+        self.burst = burst
+        self._buckets = dict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def acquire(self, key=None):
+        """Block until a request for `key` can be sent"""
+        self._bucket(key).acquire()
+
+    def current_rate(self, key=None):
+        """Return the requests per second currently allowed for `key`"""
+        return self._bucket(key).rate
+
+    def on_success(self, key=None):
+        """Called after Google answered a request for `key`"""
+
+    def on_throttle(self, key=None):
+        """Called after Google answered a request for `key` with a 429"""
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Token bucket rate limiter that looks for the highest rate Google accepts
+
+    Starts at `rate` requests per second and adapts it AIMD-style: every
+    successful request adds `increase` to the rate (up to `max_rate`) and every
+    429 multiplies it by `decrease` (down to `min_rate`), dropping the requests
+    saved for bursts.
+    """
+
+    def __init__(self, rate=1, burst=1, min_rate=0.01, max_rate=10, increase=0.05,
+                 decrease=0.5):
+        super().__init__(rate, burst=burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+
+    def on_success(self, key=None):
+        self._bucket(key).update_rate(
+            lambda rate: min(self.max_rate, rate + self.increase))
+
+    def on_throttle(self, key=None):
+        self._bucket(key).update_rate(
+            lambda rate: max(self.min_rate, rate * self.decrease), drain=True)
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """
+    Token bucket rate limiter shared by every process of a host
+
+    The buckets are stored in the SQLite database at `path`, so all the
+    workers using the same file draw from a single budget of `rate` requests
+    per second for each key. A 429 drops the saved requests of its key for
+    every worker.
+    """
+
+    def __init__(self, path, rate, burst=1):
+        super().__init__(rate, burst=burst)
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection holding the database write lock until it commits"""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            # take the write lock before reading so workers update buckets one at a time
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def _take(self, key):
+        """Refill the bucket of `key` and take a token, return the seconds to wait when there is none"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT tokens, updated FROM buckets WHERE key = ?', (key, )).fetchone()
+            tokens, updated = row if row else (self.burst, now)
+            tokens = min(self.burst, tokens + max(0, now - updated) * self.rate)
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            conn.execute('INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)', (key, tokens, now))
+        return wait
+
+    def acquire(self, key=None):
+        key = str(key)
+        while True:
+            wait = self._take(key)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def current_rate(self, key=None):
+        return self.rate
+
+    def on_throttle(self, key=None):
+        key = str(key)
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE buckets SET tokens = MIN(tokens, 0) WHERE key = ?', (key, ))
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Rate limiter shared by every worker connected to the same Redis server
+
+    Allows `rate` requests per second for each key, counted over fixed windows
+    of `window` seconds. A 429 pauses every worker for `cooldown` seconds.
+    `client` is a `redis.Redis` client or the url of the server; only basic
+    commands are used so any server speaking the Redis protocol works.
+    """
+
+    def __init__(self, client, rate, window=60, cooldown=60, prefix='pytrends'):
+        super().__init__(rate)
+        if isinstance(client, str):
+            try:
+                import redis
+            except ImportError:
+                raise ImportError('RedisRateLimiter needs the redis package: pip install redis')
+            client = redis.Redis.from_url(client)
+        self.client = client
+        self.window = window
+        self.cooldown = cooldown
+        self.prefix = prefix
+        # requests allowed in each window
+        self.budget = max(1, int(rate * window))
+
+    def acquire(self, key=None):
+        while True:
+            # wait until the pause set after a 429 is over
+            pause = self.client.pttl(f'{self.prefix}:{key}:pause')
+            if pause is not None and pause > 0:
+                time.sleep(pause / 1000)
+                continue
+            now = time.time()
+            window = int(now // self.window)
+            counter = f'{self.prefix}:{key}:{window}'
+            count = self.client.incr(counter)
+            if count == 1:
+                self.client.expire(counter, int(self.window) + 1)
+            if count <= self.budget:
+                return
+            time.sleep((window + 1) * self.window - now)
+
+    def current_rate(self, key=None):
+        return self.rate
+
+    def on_throttle(self, key=None):
+        self.client.set(f'{self.prefix}:{key}:pause', 1, px=int(self.cooldown * 1000))
@@ -1,7 +1,13 @@
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import copy
+from functools import partial
+import importlib
 from itertools import product
 import json
+import threading
+import time
 
-import pandas as pd
 import requests
 
 from requests.adapters import HTTPAdapter
@@ -9,12 +15,68 @@ from requests.packages.urllib3.util.retry import Retry
 from requests import status_codes
 
 from pytrends import exceptions
+from pytrends.cache import TTLCache, payload_key
+from pytrends.categories import CategoryIndex
+from pytrends.output import check_output, columns_output, flatten, records_output
+from pytrends.proxies import ProxyPool
+from pytrends.ratelimit import RateLimiter
 
-from urllib.parse import quote
+from urllib.parse import quote, urlparse
 
 
 BASE_TRENDS_URL = 'https://trends.google.com/trends'
 
+# payload built by `TrendReq.build_query` with the widgets Google returned for it, the data methods take it
+# as `query` instead of reading the state of the instance; widgets are shared so they must not be modified
+Query = namedtuple('Query', [
+    'kw_list', 'geo', 'token_payload', 'interest_over_time_widget', 'interest_by_region_widget',
+    'related_topics_widget_list', 'related_queries_widget_list',
+])
+
+# every section of a payload, as returned by `TrendReq.explore_all`
+ExploreResult = namedtuple('ExploreResult', [
+    'interest_over_time', 'interest_by_region', 'related_topics', 'related_queries',
+])
+
+
+class _LazyModule(object):
+    """Module imported on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# pandas and numpy take most of the import time, they are only needed once a result is parsed
+np = _LazyModule('numpy')
+pd = _LazyModule('pandas')
+
+
+def _bounded_map(func, items, max_workers):
+    """Yield `func(item)` for every item, in order, computed by `max_workers` threads
+
+    `items` is consumed lazily and at most `max_workers` items are computed ahead of the consumer.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) > max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # the consumer may stop early, don't compute the items nobody will read
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
 
 class TrendReq(object):
     """
@@ -34,9 +96,39 @@ class TrendReq(object):
     TODAY_SEARCHES_URL = f'{BASE_TRENDS_URL}/api/dailytrends'
     REALTIME_TRENDING_SEARCHES_URL = f'{BASE_TRENDS_URL}/api/realtimetrends'
     ERROR_CODES = (500, 502, 504, 429)
+    # responses meaning the google cookie was rejected
+    AUTH_ERROR_CODES = (401, 403)
+    # endpoints whose responses can be stored in a response cache, the keyword of a suggestion is in its url
+    CACHEABLE_URLS = (INTEREST_OVER_TIME_URL, MULTIRANGE_INTEREST_OVER_TIME_URL,
+                      INTEREST_BY_REGION_URL, RELATED_QUERIES_URL, SUGGESTIONS_URL,
+                      CATEGORIES_URL)
+    # maximum number of keywords Google compares in a single payload
+    MAX_KEYWORDS = 5
+    # number of recent latencies kept to compute the hedging delay, and needed before hedging
+    HEDGE_SAMPLES = 200
+    MIN_HEDGE_SAMPLES = 20
+    # widgets (and their tokens) shared by every instance created with token_cache=True
+    TOKEN_CACHE = TTLCache(maxsize=256, ttl=300)
+    # category index of each language (hl), shared by every instance
+    CATEGORY_INDEXES = dict()
+    # trailing timeframes used to refresh interest over time, with the seconds between
+    # their points and their length in seconds, from the shortest one
+    REFRESH_TIMEFRAMES = (
+        ('now 1-H', 60, 60 * 60),
+        ('now 4-H', 60, 4 * 60 * 60),
+        ('now 1-d', 8 * 60, 24 * 60 * 60),
+        ('now 7-d', 60 * 60, 7 * 24 * 60 * 60),
+        ('today 1-m', 24 * 60 * 60, 30 * 24 * 60 * 60),
+        ('today 3-m', 24 * 60 * 60, 90 * 24 * 60 * 60),
+        ('today 12-m', 7 * 24 * 60 * 60, 365 * 24 * 60 * 60),
+        ('today 5-y', 7 * 24 * 60 * 60, 5 * 365 * 24 * 60 * 60),
+    )
 
     def __init__(self, hl='en-US', tz=360, geo='', timeout=(2, 5), proxies='',
-                 retries=0, backoff_factor=0, requests_args=None):
+                 retries=0, backoff_factor=0, requests_args=None,
+                 pool_connections=10, pool_maxsize=10, keep_alive=True,
+                 token_cache=None, response_cache=None, rate_limiter=None,
+                 cookie_ttl=6 * 60 * 60, prewarm=False, hedge_after=None, deadline=None):
         """
         Initialize default values for params
         """
@@ -50,11 +142,48 @@ class TrendReq(object):
         self.kw_list = list()
         self.timeout = timeout
         self.proxies = proxies  # add a proxy option
+        # the proxy of each request is picked from a pool that tracks their health
+        self.proxy_pool = proxies if isinstance(proxies, ProxyPool) else ProxyPool(proxies or ())
         self.retries = retries
         self.backoff_factor = backoff_factor
         self.proxy_index = 0
         self.requests_args = requests_args or {}
-        self.cookies = self.GetGoogleCookie()
+        # connection pooling, one long-lived session per proxy
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self._sessions = dict()
+        self._sessions_lock = threading.Lock()
+        # widgets of recent payloads, tokens expire so entries must have a short ttl
+        self.token_cache = TrendReq.TOKEN_CACHE if token_cache is True else token_cache
+        # persistent cache of widget data responses, see pytrends.cache.ResponseCache
+        self.response_cache = response_cache
+        # client side throttling, see pytrends.ratelimit; can be shared between instances
+        self.rate_limiter = rate_limiter
+        # percentile of the recent latencies after which a request is sent again through
+        # another proxy or connection, the first response wins
+        self.hedge_after = hedge_after
+        # seconds a request may take in total, across proxy changes and hedges
+        self.deadline = deadline
+        self._latencies = deque(maxlen=TrendReq.HEDGE_SAMPLES)
+        self._hedge_executor = None
+        self._hedge_executor_lock = threading.Lock()
+
+        self.headers = {'accept-language': self.hl}
+        self.headers.update(self.requests_args.pop('headers', {}))
+
+        # google cookie of each proxy ('' without proxy) with its expiry time,
+        # requested on first use and kept for at most cookie_ttl seconds
+        self.cookie_ttl = cookie_ttl
+        self._cookie_jar = dict()
+        self._cookie_jar_lock = threading.Lock()
+        # one lock per proxy, so concurrent first requests wait for a single cookie request
+        self._cookie_locks = dict()
+        # fetch the cookie in the background so the first request doesn't wait for it
+        self._prewarm_thread = None
+        if prewarm:
+            self._prewarm_thread = threading.Thread(target=self._prewarm, daemon=True)
+            self._prewarm_thread.start()
         # intialize widget payloads
         self.token_payload = dict()
         self.interest_over_time_widget = dict()
@@ -62,48 +191,141 @@ class TrendReq(object):
         self.related_topics_widget_list = list()
         self.related_queries_widget_list = list()
 
-        self.headers = {'accept-language': self.hl}
-        self.headers.update(self.requests_args.pop('headers', {}))
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close every pooled session and release its connections"""
+        with self._hedge_executor_lock:
+            if self._hedge_executor is not None:
+                self._hedge_executor.shutdown(wait=False)
+                self._hedge_executor = None
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def _get_session(self, proxy=''):
+        """Return the pooled session used for `proxy`, creating it on first use
+
+        Sessions are kept for the lifetime of the instance so that connections to
+        Google are reused (keep-alive) instead of paying a new TCP+TLS handshake
+        on every request.
+        """
+        with self._sessions_lock:
+            session = self._sessions.get(proxy)
+            if session is not None:
+                return session
+            session = requests.session()
+            adapter_args = {
+                'pool_connections': self.pool_connections,
+                'pool_maxsize': self.pool_maxsize,
+            }
+            # Retries mechanism. Activated when one of statements >0 (best used for proxy)
+            if self.retries > 0 or self.backoff_factor > 0:
+                adapter_args['max_retries'] = Retry(
+                    total=self.retries, read=self.retries,
+                    connect=self.retries,
+                    backoff_factor=self.backoff_factor,
+                    status_forcelist=TrendReq.ERROR_CODES,
+                    method_whitelist=frozenset(['GET', 'POST']))
+            session.mount('https://', HTTPAdapter(**adapter_args))
+            session.headers.update(self.headers)
+            if not self.keep_alive:
+                session.headers['Connection'] = 'close'
+            if proxy:
+                session.proxies.update({'https': proxy})
+            self._sessions[proxy] = session
+            return session
+
+    @property
+    def cookies(self):
+        """Google cookie of the next proxy (or without proxy), requested on first use"""
+        return self.GetGoogleCookie()
+
+    @cookies.setter
+    def cookies(self, cookies):
+        with self._cookie_jar_lock:
+            self._cookie_jar[''] = (cookies, time.time() + self.cookie_ttl)
 
     def GetGoogleCookie(self):
         """
-        Gets google cookie (used for each and every proxy; once on init otherwise)
-        Removes proxy from the list on proxy error
+        Gets google cookie (once for each proxy, again when it expires)
+        Quarantines the proxy in the pool on proxy error
         """
         while True:
             if "proxies" in self.requests_args:
                 try:
-                    return dict(filter(lambda i: i[0] == 'NID', requests.get(
-                        f'{BASE_TRENDS_URL}/explore/?geo={self.hl[-2:]}',
-                        timeout=self.timeout,
-                        **self.requests_args
-                    ).cookies.items()))
+                    return self._proxy_cookies()
                 except:
                     continue
             else:
-                if len(self.proxies) > 0:
-                    proxy = {'https': self.proxies[self.proxy_index]}
+                if len(self.proxy_pool) > 0:
+                    proxy = self.proxy_pool.acquire()
                 else:
                     proxy = ''
+                start = time.monotonic()
                 try:
-                    return dict(filter(lambda i: i[0] == 'NID', requests.get(
-                        f'{BASE_TRENDS_URL}/explore/?geo={self.hl[-2:]}',
-                        timeout=self.timeout,
-                        proxies=proxy,
-                        **self.requests_args
-                    ).cookies.items()))
+                    cookies = self._proxy_cookies(proxy)
                 except requests.exceptions.ProxyError:
                     print('Proxy error. Changing IP')
-                    if len(self.proxies) > 1:
-                        self.proxies.remove(self.proxies[self.proxy_index])
-                    else:
-                        print('No more proxies available. Bye!')
-                        raise
+                    self.proxy_pool.release(proxy, error='failed')
                     continue
+                self.proxy_pool.release(proxy, latency=time.monotonic() - start)
+                return cookies
+
+    def _prewarm(self):
+        """Fetch the google cookie, errors are raised again by the first request"""
+        try:
+            self.GetGoogleCookie()
+        except Exception:
+            pass
+
+    def _proxy_cookies(self, proxy=''):
+        """Return the google cookie of `proxy`, requesting it only when missing or expired"""
+        prewarm_thread = self._prewarm_thread
+        if prewarm_thread is not None and prewarm_thread is not threading.current_thread():
+            prewarm_thread.join()
+        with self._cookie_jar_lock:
+            cookies, expires = self._cookie_jar.get(proxy, (None, 0))
+            proxy_lock = self._cookie_locks.setdefault(proxy, threading.Lock())
+        if expires > time.time():
+            return cookies
+        with proxy_lock:
+            # another thread may have requested it meanwhile
+            with self._cookie_jar_lock:
+                cookies, expires = self._cookie_jar.get(proxy, (None, 0))
+            if expires > time.time():
+                return cookies
+            cookies, expires = self._google_cookie(proxy)
+            with self._cookie_jar_lock:
+                self._cookie_jar[proxy] = (cookies, expires)
+        return cookies
+
+    def _google_cookie(self, proxy=''):
+        """Request the google cookie through `proxy` and return it with its expiry time"""
+        response = self._get_session(proxy).get(
+            f'{BASE_TRENDS_URL}/explore/?geo={self.hl[-2:]}',
+            timeout=self.timeout,
+            **self.requests_args
+        )
+        cookies = dict()
+        expires = time.time() + self.cookie_ttl
+        for cookie in response.cookies:
+            if cookie.name == 'NID':
+                cookies[cookie.name] = cookie.value
+                if cookie.expires:
+                    expires = min(expires, cookie.expires)
+        return cookies, expires
 
     def GetNewProxy(self):
         """
         Increment proxy INDEX; zero on overflow
+        Proxies are now picked by `self.proxy_pool`, this is kept for compatibility
         """
         if self.proxy_index < (len(self.proxies) - 1):
             self.proxy_index += 1
@@ -119,27 +341,18 @@ class TrendReq(object):
         :param kwargs: any extra key arguments passed to the request builder (usually query parameters or data)
         :return:
         """
-        s = requests.session()
-        # Retries mechanism. Activated when one of statements >0 (best used for proxy)
-        if self.retries > 0 or self.backoff_factor > 0:
-            retry = Retry(total=self.retries, read=self.retries,
-                          connect=self.retries,
-                          backoff_factor=self.backoff_factor,
-                          status_forcelist=TrendReq.ERROR_CODES,
-                          method_whitelist=frozenset(['GET', 'POST']))
-            s.mount('https://', HTTPAdapter(max_retries=retry))
-
-        s.headers.update(self.headers)
-        if len(self.proxies) > 0:
-            self.cookies = self.GetGoogleCookie()
-            s.proxies.update({'https': self.proxies[self.proxy_index]})
-        if method == TrendReq.POST_METHOD:
-            response = s.post(url, timeout=self.timeout,
-                              cookies=self.cookies, **kwargs,
-                              **self.requests_args)  # DO NOT USE retries or backoff_factor here
+        cache_key = None
+        if self.response_cache is not None and url.startswith(TrendReq.CACHEABLE_URLS):
+            params = kwargs.get('params', {})
+            cache_key = self.response_cache.key(url, params)
+            content = self.response_cache.get(cache_key)
+            if content is not None:
+                return json.loads(content)
+
+        if self.hedge_after is None and self.deadline is None:
+            response, limiter_key = self._send(url, method, **kwargs)
         else:
-            response = s.get(url, timeout=self.timeout, cookies=self.cookies,
-                             **kwargs, **self.requests_args)  # DO NOT USE retries or backoff_factor here
+            response, limiter_key = self._hedged_send(url, method, **kwargs)
         # check if the response contains json and throw an exception otherwise
         # Google mostly sends 'application/json' in the Content-Type header,
         # but occasionally it sends 'application/javascript
@@ -152,83 +365,286 @@ class TrendReq(object):
             # some responses start with garbage characters, like ")]}',"
             # these have to be cleaned before being passed to the json parser
             content = response.text[trim_chars:]
+            if self.rate_limiter is not None:
+                self.rate_limiter.on_success(limiter_key)
             # parse json
-            self.GetNewProxy()
-            return json.loads(content)
+            result = json.loads(content)
+            if cache_key is not None:
+                self.response_cache.set(cache_key, content, self.response_cache.ttl(params))
+            return result
         else:
             if response.status_code == status_codes.codes.too_many_requests:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.on_throttle(limiter_key)
                 raise exceptions.TooManyRequestsError.from_response(response)
             raise exceptions.ResponseError.from_response(response)
 
+    def _send(self, url, method, exclude=(), proxies_used=None, **kwargs):
+        """Send a single request and return the response with the key it was rate limited by
+
+        Changes proxy on proxy errors and refreshes a rejected cookie once. The proxies in `exclude` are avoided
+        when others are available, every proxy tried is appended to `proxies_used`.
+        """
+        refreshed_cookies = False
+        # proxies that raised a proxy error, each proxy is tried once per request
+        failed = set()
+        while True:
+            proxy = ''
+            if failed:
+                try:
+                    proxy = self.proxy_pool.acquire(exclude=failed)
+                except exceptions.NoProxyAvailableError:
+                    raise proxy_error
+            elif len(self.proxy_pool) > 0:
+                try:
+                    proxy = self.proxy_pool.acquire(exclude=exclude)
+                except exceptions.NoProxyAvailableError:
+                    # wait for a quarantined proxy to come back, at most for the deadline
+                    proxy = self.proxy_pool.acquire(timeout=self.deadline)
+            if proxies_used is not None:
+                proxies_used.append(proxy)
+            s = self._get_session(proxy)
+            # requests are throttled separately for each proxy, or by host without them
+            limiter_key = proxy or urlparse(url).netloc
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(limiter_key)
+            start = time.monotonic()
+            try:
+                cookies = self._proxy_cookies(proxy)
+                if method == TrendReq.POST_METHOD:
+                    response = s.post(url, timeout=self.timeout,
+                                      cookies=cookies, **kwargs,
+                                      **self.requests_args)  # DO NOT USE retries or backoff_factor here
+                else:
+                    response = s.get(url, timeout=self.timeout, cookies=cookies,
+                                     **kwargs, **self.requests_args)  # DO NOT USE retries or backoff_factor here
+            except requests.exceptions.ProxyError as err:
+                if not proxy:
+                    raise
+                # quarantine the proxy and try with another one
+                print('Proxy error. Changing IP')
+                self.proxy_pool.release(proxy, error='failed')
+                failed.add(proxy)
+                proxy_error = err
+                continue
+            except requests.exceptions.RequestException:
+                if proxy:
+                    self.proxy_pool.release(proxy, error='failed')
+                raise
+            if response.status_code in TrendReq.AUTH_ERROR_CODES and not refreshed_cookies:
+                # the cookie was rejected, get a new one and try again once
+                with self._cookie_jar_lock:
+                    self._cookie_jar.pop(proxy, None)
+                if proxy:
+                    self.proxy_pool.release(proxy, latency=time.monotonic() - start)
+                refreshed_cookies = True
+                continue
+            break
+        latency = time.monotonic() - start
+        self._latencies.append(latency)
+        if proxy:
+            if response.status_code == status_codes.codes.too_many_requests:
+                self.proxy_pool.release(proxy, error='throttled')
+            elif response.status_code >= 500:
+                self.proxy_pool.release(proxy, error='failed')
+            else:
+                self.proxy_pool.release(proxy, latency=latency)
+        return response, limiter_key
+
+    def _hedge_delay(self):
+        """Return the `hedge_after` percentile of the recent latencies, or None while there are too few of them"""
+        if self.hedge_after is None:
+            return None
+        latencies = sorted(self._latencies)
+        if len(latencies) < TrendReq.MIN_HEDGE_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.hedge_after / 100))]
+
+    def _hedged_send(self, url, method, **kwargs):
+        """Like `_send`, but sends a duplicate request when the first one is slow and enforces the deadline
+
+        Raises `DeadlineExceededError` when no response arrived within `deadline` seconds, the requests still in
+        flight are left to finish in the background.
+        """
+        with self._hedge_executor_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=2 * self.pool_maxsize)
+            executor = self._hedge_executor
+        start = time.monotonic()
+        deadline_at = None if self.deadline is None else start + self.deadline
+        delay = self._hedge_delay()
+        hedge_at = None if delay is None else start + delay
+        proxies_used = []
+        pending = {executor.submit(self._send, url, method, proxies_used=proxies_used, **kwargs)}
+        error = None
+        while pending:
+            wake_ups = [at for at in (deadline_at, hedge_at) if at is not None]
+            timeout = max(0, min(wake_ups) - time.monotonic()) if wake_ups else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            # the first successful response wins
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+            now = time.monotonic()
+            if deadline_at is not None and now >= deadline_at:
+                raise exceptions.DeadlineExceededError(
+                    f'No response from Google within {self.deadline} seconds')
+            if hedge_at is not None and now >= hedge_at and pending:
+                pending.add(executor.submit(
+                    self._send, url, method, exclude=tuple(proxies_used), **kwargs))
+                hedge_at = None
+        raise error
+
     def build_payload(self, kw_list, cat=0, timeframe='today 5-y', geo='',
                       gprop=''):
-        """Create the payload for related queries, interest over time and interest by region"""
-        if gprop not in ['', 'images', 'news', 'youtube', 'froogle']:
-            raise ValueError('gprop must be empty (to indicate web), images, news, youtube, or froogle')
+        """Create the payload for related queries, interest over time and interest by region
+
+        The payload is used by the data methods called without `query`. It is also returned as a `Query`, see
+        `build_query`.
+        """
+        query = self.build_query(kw_list, cat=cat, timeframe=timeframe, geo=geo, gprop=gprop)
+        self.token_payload = query.token_payload
         self.kw_list = kw_list
-        self.geo = geo or self.geo
-        self.token_payload = {
-            'hl': self.hl,
-            'tz': self.tz,
-            'req': {'comparisonItem': [], 'category': cat, 'property': gprop}
-        }
+        self.geo = list(query.geo)
+        self.interest_over_time_widget = query.interest_over_time_widget
+        self.interest_by_region_widget = query.interest_by_region_widget
+        # clear self.related_queries_widget_list and self.related_topics_widget_list
+        # of old keywords'widgets
+        self.related_queries_widget_list[:] = query.related_queries_widget_list
+        self.related_topics_widget_list[:] = query.related_topics_widget_list
+        return query
 
-        if not isinstance(self.geo, list):
-            self.geo = [self.geo]
+    def build_query(self, kw_list, cat=0, timeframe='today 5-y', geo='', gprop=''):
+        """Create the payload for related queries, interest over time and interest by region and return it as a `Query`
 
+        Unlike `build_payload` the instance isn't changed: pass the query to the data methods as `query`, so a single
+        instance can serve many queries from many threads.
+        """
+        geo = geo or self.geo
+        if not isinstance(geo, list):
+            geo = [geo]
+        token_payload = self._token_payload(
+            kw_list, cat=cat, timeframe=timeframe, geo=geo, gprop=gprop)
+        # get tokens
+        widgets = self._widgets(token_payload)
+        return Query(
+            kw_list=tuple(kw_list),
+            geo=tuple(geo),
+            token_payload=token_payload,
+            interest_over_time_widget=widgets['interest_over_time'],
+            interest_by_region_widget=widgets['interest_by_region'],
+            related_topics_widget_list=tuple(widgets['related_topics']),
+            related_queries_widget_list=tuple(widgets['related_queries']),
+        )
+
+    def _current_query(self):
+        """Return the payload built by the last `build_payload` call as a `Query`"""
+        return Query(
+            kw_list=self.kw_list,
+            geo=self.geo,
+            token_payload=self.token_payload,
+            interest_over_time_widget=self.interest_over_time_widget,
+            interest_by_region_widget=self.interest_by_region_widget,
+            related_topics_widget_list=self.related_topics_widget_list,
+            related_queries_widget_list=self.related_queries_widget_list,
+        )
+
+    def _token_payload(self, kw_list, cat=0, timeframe='today 5-y', geo=('',),
+                       gprop=''):
+        """Create the payload sent to Google to get the API tokens of `kw_list` for every region in `geo`"""
         # Check if timeframe is a list
         if isinstance(timeframe, list):
-            for index, (kw, geo) in enumerate(product(self.kw_list, self.geo)):
-                keyword_payload = {'keyword': kw, 'time': timeframe[index], 'geo': geo}
-                self.token_payload['req']['comparisonItem'].append(keyword_payload)
+            items = [{'keyword': kw, 'time': timeframe[index], 'geo': g}
+                     for index, (kw, g) in enumerate(product(kw_list, geo))]
         else:
             # build out json for each keyword with
-            for kw, geo in product(self.kw_list, self.geo):
-                keyword_payload = {'keyword': kw, 'time': timeframe, 'geo': geo}
-                self.token_payload['req']['comparisonItem'].append(keyword_payload)
+            items = [{'keyword': kw, 'time': timeframe, 'geo': g}
+                     for kw, g in product(kw_list, geo)]
+        return self._comparison_payload(items, cat=cat, gprop=gprop)
 
-        # requests will mangle this if it is not a string
-        self.token_payload['req'] = json.dumps(self.token_payload['req'])
-        # get tokens
-        self._tokens()
-        return
+    def _comparison_payload(self, items, cat=0, gprop=''):
+        """Create the payload sent to Google to get the API tokens of a list of comparison items
 
-    def _tokens(self):
-        """Makes request to Google to get API tokens for interest over time, interest by region and related queries"""
+        Each item is a dictionary with a 'keyword', a 'time' and a 'geo'.
+        """
+        if gprop not in ['', 'images', 'news', 'youtube', 'froogle']:
+            raise ValueError('gprop must be empty (to indicate web), images, news, youtube, or froogle')
+        token_payload = {
+            'hl': self.hl,
+            'tz': self.tz,
+            'req': {'comparisonItem': list(items), 'category': cat, 'property': gprop}
+        }
+        # requests will mangle this if it is not a string
+        token_payload['req'] = json.dumps(token_payload['req'])
+        return token_payload
+
+    def _widgets(self, token_payload):
+        """Request the widgets of `token_payload` and return them in a dictionary keyed by section"""
+        if self.token_cache is not None:
+            key = payload_key(token_payload)
+            widgets = self.token_cache.get(key)
+            if widgets is None:
+                widgets = self._request_widgets(token_payload)
+                self.token_cache.set(key, widgets)
+            # callers are free to modify the widgets, keep the cached ones intact
+            return copy.deepcopy(widgets)
+        return self._request_widgets(token_payload)
+
+    def _request_widgets(self, token_payload):
+        """Makes request to Google to get the widgets of `token_payload`"""
         # make the request and parse the returned json
         widget_dicts = self._get_data(
             url=TrendReq.GENERAL_URL,
             method=TrendReq.POST_METHOD,
-            params=self.token_payload,
+            params=token_payload,
             trim_chars=4,
         )['widgets']
+        widgets = {
+            'interest_over_time': dict(),
+            'interest_by_region': dict(),
+            'related_topics': list(),
+            'related_queries': list(),
+        }
         # order of the json matters...
         first_region_token = True
-        # clear self.related_queries_widget_list and self.related_topics_widget_list
-        # of old keywords'widgets
-        self.related_queries_widget_list[:] = []
-        self.related_topics_widget_list[:] = []
         # assign requests
         for widget in widget_dicts:
             if widget['id'] == 'TIMESERIES':
-                self.interest_over_time_widget = widget
+                widgets['interest_over_time'] = widget
             if widget['id'] == 'GEO_MAP' and first_region_token:
-                self.interest_by_region_widget = widget
+                widgets['interest_by_region'] = widget
                 first_region_token = False
             # response for each term, put into a list
             if 'RELATED_TOPICS' in widget['id']:
-                self.related_topics_widget_list.append(widget)
+                widgets['related_topics'].append(widget)
             if 'RELATED_QUERIES' in widget['id']:
-                self.related_queries_widget_list.append(widget)
-        return
+                widgets['related_queries'].append(widget)
+        return widgets
+
+    def interest_over_time(self, dtype='int64', output='pandas', query=None):
+        """Request data from Google's Interest Over Time section and return a dataframe
+
+        `dtype` is the type of the keyword columns, values go from 0 to 100 so 'uint8' is enough to hold them.
+        `output` selects the format of the result, see `pytrends.output`; outside of pandas the columns are
+        'date', one per keyword ('keyword_region' with several regions) and 'isPartial'.
+        `query` is a `Query` built by `build_query`, defaults to the payload of the last `build_payload` call.
+        """
+        check_output(output)
+        query = query or self._current_query()
+        return self._interest_over_time(
+            query.interest_over_time_widget, query.kw_list, query.geo, dtype=dtype, output=output)
 
-    def interest_over_time(self):
-        """Request data from Google's Interest Over Time section and return a dataframe"""
+    def _interest_over_time(self, widget, kw_list, geo, dtype='int64', output='pandas'):
+        """Request the Interest Over Time data of `widget` and return it in `output` format
 
+        `kw_list` and `geo` are the keywords and regions the widget was built for, used to name the columns.
+        """
         over_time_payload = {
             # convert to string as requests will mangle
-            'req': json.dumps(self.interest_over_time_widget['request']),
-            'token': self.interest_over_time_widget['token'],
+            'req': json.dumps(widget['request']),
+            'token': widget['token'],
             'tz': self.tz
         }
 
@@ -240,55 +656,214 @@ class TrendReq(object):
             params=over_time_payload,
         )
 
-        df = pd.DataFrame(req_json['default']['timelineData'])
-        if (df.empty):
-            return df
-
-        df['date'] = pd.to_datetime(df['time'].astype(dtype='float64'),
-                                    unit='s')
-        df = df.set_index(['date']).sort_index()
-        # split list columns into seperate ones, remove brackets and split on comma
-        result_df = df['value'].apply(lambda x: pd.Series(
-            str(x).replace('[', '').replace(']', '').split(',')))
-        # rename each column with its search term, relying on order that google provides...
-
-        for idx, (kw, g) in enumerate(product(self.kw_list, self.geo)):
-            # there is currently a bug with assigning columns that may be
-            # parsed as a date in pandas: use explicit insert column method
-            name = kw if len(self.geo) == 1 else (kw, g)
-            result_df.insert(len(result_df.columns), name,
-                             result_df[idx].astype('int'))
-            del result_df[idx]
-
-        if 'isPartial' in df:
-            # make other dataframe from isPartial key data
-            # split list columns into seperate ones, remove brackets and split on comma
-            df = df.fillna(False)
-            result_df2 = df['isPartial'].apply(lambda x: pd.Series(
-                str(x).replace('[', '').replace(']', '').split(',')))
-            result_df2.columns = ['isPartial']
-            # Change to a bool type.
-            result_df2.isPartial = result_df2.isPartial == 'True'
-            # concatenate the two dataframes
-            final = pd.concat([result_df, result_df2], axis=1)
-        else:
-            final = result_df
-            final['isPartial'] = False
-
-        if len(self.geo) > 1:
+        timeline = req_json['default']['timelineData']
+        if not timeline:
+            return pd.DataFrame(timeline) if output == 'pandas' else columns_output({}, output)
+
+        # build every column straight from the json lists, one value per keyword and region in each point
+        times = np.array([point['time'] for point in timeline], dtype='float64')
+        order = np.argsort(times, kind='stable')
+        values = np.array([point['value'] for point in timeline], dtype=dtype)[order]
+        is_partial = np.array([point.get('isPartial', False) for point in timeline],
+                              dtype=bool)[order]
+        if output != 'pandas':
+            columns = {'date': times[order].astype('int64').astype('datetime64[s]')}
+            if len(geo) > 1:
+                names = [f'{kw}_{region}' for kw, region in product(kw_list, geo)]
+            else:
+                names = list(kw_list)
+            for idx, name in enumerate(names):
+                columns[name] = values[:, idx]
+            columns['isPartial'] = is_partial
+            return columns_output(columns, output)
+        index = pd.Index(pd.to_datetime(times[order], unit='s'), name='date')
+
+        final = pd.DataFrame(values, index=index)
+        final['isPartial'] = is_partial
+        # name each column with its search term, relying on order that google provides...
+        if len(geo) > 1:
             final.columns = pd.MultiIndex.from_tuples(
-                [c if isinstance(c, tuple) else (c, ) for c in final],
+                list(product(kw_list, geo)) + [('isPartial', )],
                 names=['keyword', 'region']
             )
+        else:
+            final.columns = list(kw_list) + ['isPartial']
         return final
 
-    def multirange_interest_over_time(self):
-        """Request data from Google's Interest Over Time section across different time ranges and return a dataframe"""
+    def refresh_interest_over_time(self, stored, dtype='int64', query=None):
+        """Bring `stored`, a dataframe returned by `interest_over_time` for the current payload, up to date
+
+        Only the shortest trailing timeframe (see `REFRESH_TIMEFRAMES`) with the same resolution as `stored`
+        that covers its last complete point is requested. The new points are rescaled onto the scale of
+        `stored` using the complete points both share, then they replace the partial points of `stored`
+        and are appended to it, so values can go over 100. When no such timeframe exists or the shared
+        points can't be compared, the whole payload is requested again. `query` is the `Query` `stored` was
+        requested for, see `interest_over_time`.
+        """
+        query = query or self._current_query()
+        complete = stored[~self._is_partial(stored)]
+        if len(stored) < 2 or complete.empty:
+            return self.interest_over_time(dtype=dtype, query=query)
+        step = pd.Series(stored.index).diff().median().total_seconds()
+        # the refresh must include the last complete point to rescale the new ones
+        needed = (pd.Timestamp.now(tz='UTC').tz_localize(None) - complete.index[-1]).total_seconds() + step
+        for timeframe, point_step, length in TrendReq.REFRESH_TIMEFRAMES:
+            if point_step == step and length >= needed:
+                break
+        else:
+            return self.interest_over_time(dtype=dtype, query=query)
+
+        req = json.loads(query.token_payload['req'])
+        _, fresh = self._payload_interest_over_time({
+            'kw_list': list(query.kw_list), 'timeframe': timeframe, 'geo': list(query.geo),
+            'cat': req['category'], 'gprop': req['property'],
+        }, dtype=dtype)
+        if fresh.empty:
+            return self.interest_over_time(dtype=dtype, query=query)
+        # with several regions the columns are (keyword, region) pairs and an ('isPartial', ) one
+        columns = list(stored.columns[stored.columns.get_level_values(0) != 'isPartial'])
+        fresh_complete = fresh[~self._is_partial(fresh)]
+        shared = complete.index.intersection(fresh_complete.index)
+        stored_total = complete.loc[shared, columns].to_numpy().sum()
+        fresh_total = fresh_complete.loc[shared, columns].to_numpy().sum()
+        if not stored_total > 0 or not fresh_total > 0:
+            return self.interest_over_time(dtype=dtype, query=query)
+
+        new = fresh[fresh.index > complete.index[-1]]
+        new = new.astype({column: 'float64' for column in columns})
+        new[columns] = new[columns] * (stored_total / fresh_total)
+        return pd.concat([complete, new])
+
+    @staticmethod
+    def _is_partial(df):
+        """Return the isPartial column of an interest over time dataframe as a boolean series"""
+        is_partial = df['isPartial']
+        if isinstance(is_partial, pd.DataFrame):
+            # several regions, isPartial is a second level column
+            is_partial = is_partial.iloc[:, 0]
+        return is_partial.astype(bool)
+
+    def iter_interest_over_time(self, payloads, max_workers=1, dtype='int64', output='pandas'):
+        """Request Interest Over Time data for each payload and yield (payload, result) pairs as they arrive
+
+        `payloads` is an iterable of dictionaries of `build_payload` arguments, e.g.
+        `{'kw_list': ['pizza'], 'timeframe': '2021-01-01 2021-01-31', 'geo': 'US'}`. It is consumed lazily and
+        at most `max_workers` payloads are requested ahead of the consumer, so memory stays bounded however
+        long the job is. Results come in the order of the payloads, each with its payload completed with the
+        default arguments. `dtype` and `output` are passed along to `interest_over_time`. The payload built
+        by `build_payload` is left untouched.
+        """
+        check_output(output)
+        return _bounded_map(
+            partial(self._payload_interest_over_time, dtype=dtype, output=output),
+            payloads, max_workers)
+
+    def _payload_interest_over_time(self, payload, dtype='int64', output='pandas'):
+        """Request the Interest Over Time data of a dictionary of `build_payload` arguments
+
+        Returns a (payload, result) pair, the payload completed with the default arguments. Unlike
+        `build_payload`, this doesn't change the state of the instance so it can be called from many threads.
+        """
+        payload = dict({'cat': 0, 'timeframe': 'today 5-y', 'geo': '', 'gprop': ''}, **payload)
+        payload['geo'] = payload['geo'] or self.geo
+        geo = payload['geo'] if isinstance(payload['geo'], list) else [payload['geo']]
+        token_payload = self._token_payload(
+            payload['kw_list'], cat=payload['cat'], timeframe=payload['timeframe'], geo=geo,
+            gprop=payload['gprop'])
+        widget = self._widgets(token_payload)['interest_over_time']
+        return payload, self._interest_over_time(
+            widget, payload['kw_list'], geo, dtype=dtype, output=output)
+
+    def batch_interest_over_time(self, keywords, cat=0, timeframe='today 5-y',
+                                 geo='', gprop='', max_workers=4, rate_limit=None,
+                                 anchor=None, dtype='int64'):
+        """Request Interest Over Time data for any number of keywords and return a single dataframe
+
+        The keywords are split into payloads of up to `MAX_KEYWORDS` terms which are requested in parallel
+        by `max_workers` threads. `rate_limit` caps the number of requests sent per second across all of them.
+        Google scales each payload on its own, so values are only comparable between keywords of the same payload
+        unless an `anchor` keyword is given: it is then added to every payload and used to bring all of them
+        onto a single scale. `dtype` is the type of the keyword columns of each payload, see `interest_over_time`.
+        """
+        keywords = [kw for kw in dict.fromkeys(keywords) if kw != anchor]
+        geo = geo or self.geo
+        geo = geo if isinstance(geo, list) else [geo]
+        if anchor is not None and len(geo) > 1:
+            raise ValueError('anchor can only be used with a single region')
+        limiter = RateLimiter(rate_limit) if rate_limit else None
+
+        def fetch(kw_list):
+            if anchor is not None:
+                kw_list = kw_list + [anchor]
+            token_payload = self._token_payload(
+                kw_list, cat=cat, timeframe=timeframe, geo=geo, gprop=gprop)
+            if limiter:
+                limiter.acquire()
+            widget = self._widgets(token_payload)['interest_over_time']
+            if limiter:
+                limiter.acquire()
+            return self._interest_over_time(widget, kw_list, geo, dtype=dtype)
+
+        # every keyword is compared in every region
+        shard_size = TrendReq.MAX_KEYWORDS // len(geo) if anchor is None else TrendReq.MAX_KEYWORDS - 1
+        if shard_size < 1:
+            raise ValueError(f'at most {TrendReq.MAX_KEYWORDS} regions can be compared')
+        shards = [keywords[i:i + shard_size]
+                  for i in range(0, len(keywords), shard_size)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            frames = [df for df in executor.map(fetch, shards) if not df.empty]
+        if not frames:
+            return pd.DataFrame()
+
+        # a date is partial if it is partial in any of the payloads
+        is_partial = pd.concat([df['isPartial'] for df in frames], axis=1)
+        frames = [df.drop(columns='isPartial') for df in frames]
+        if anchor is None:
+            result_df = pd.concat(frames, axis=1)
+        else:
+            result_df = TrendReq._normalize_to_anchor(frames, anchor)
+        result_df['isPartial'] = is_partial.fillna(False).any(axis=1)
+        return result_df
+
+    @staticmethod
+    def _normalize_to_anchor(frames, anchor):
+        """Bring payloads that share the `anchor` column onto a single scale and return them as one dataframe
+
+        Every payload is scaled by the ratio between its anchor total and the largest anchor total, then the
+        whole result is scaled so its highest value is 100. Payloads where the anchor is always 0 can't be
+        compared to the others and end up as NaN.
+        """
+        anchor_totals = pd.Series([df[anchor].sum() for df in frames], dtype='float64')
+        reference = anchor_totals.idxmax()
+        scales = anchor_totals.max() / anchor_totals.where(anchor_totals > 0)
+
+        # the anchor itself is kept once, from the payload used as reference
+        columns = [frames[reference][[anchor]]]
+        column_scales = [pd.Series(1.0, index=[anchor])]
+        for df, scale in zip(frames, scales):
+            keywords_df = df.drop(columns=anchor)
+            columns.append(keywords_df)
+            column_scales.append(pd.Series(scale, index=keywords_df.columns))
+        result_df = pd.concat(columns, axis=1)
+        result_df = result_df * pd.concat(column_scales)
+        result_df = result_df * (100 / result_df.max().max())
+        return result_df[[c for c in result_df.columns if c != anchor] + [anchor]]
+
+    def multirange_interest_over_time(self, tidy=False, dtype='int64', query=None):
+        """Request data from Google's Interest Over Time section across different time ranges and return a dataframe
+
+        By default the dataframe has a date and a value column for each range, with the averages in the first row.
+        With `tidy=True` returns a (dataframe, averages) pair instead: the dataframe has one row per range and date
+        with 'range', 'keyword', 'date', 'value' and 'isPartial' columns, and the averages are a series indexed by
+        range and keyword. `query` is a `Query` built by `build_query`, defaults to the payload of the last
+        `build_payload` call.
+        """
+        query = query or self._current_query()
 
         over_time_payload = {
             # convert to string as requests will mangle
-            'req': json.dumps(self.interest_over_time_widget['request']),
-            'token': self.interest_over_time_widget['token'],
+            'req': json.dumps(query.interest_over_time_widget['request']),
+            'token': query.interest_over_time_widget['token'],
             'tz': self.tz
         }
 
@@ -300,51 +875,69 @@ class TrendReq(object):
             params=over_time_payload,
         )
 
-        df = pd.DataFrame(req_json['default']['timelineData'])
-        if (df.empty):
-            return df
-
-        result_df = pd.json_normalize(df['columnData'])
-
-        # Split dictionary columns into seperate ones
-        for i, column in enumerate(result_df.columns):
-            result_df["[" + str(i) + "] " + str(self.kw_list[i]) + " date"] = result_df[i].apply(pd.Series)["formattedTime"]
-            result_df["[" + str(i) + "] " + str(self.kw_list[i]) + " value"] = result_df[i].apply(pd.Series)["value"]
-            result_df = result_df.drop([i], axis=1)
-
-        # Adds a row with the averages at the top of the dataframe
-        avg_row = {}
-        for i, avg in enumerate(req_json['default']['averages']):
-            avg_row["[" + str(i) + "] " + str(self.kw_list[i]) + " date"] = "Average"
-            avg_row["[" + str(i) + "] " + str(self.kw_list[i]) + " value"] = req_json['default']['averages'][i]
-
-        result_df.loc[-1] = avg_row
-        result_df.index = result_df.index + 1
-        result_df = result_df.sort_index()
-
-        return result_df
-
+        timeline = req_json['default']['timelineData']
+        averages = req_json['default']['averages']
+        if not timeline:
+            df = pd.DataFrame(timeline)
+            return (df, pd.Series(averages, dtype='float64')) if tidy else df
+
+        n_ranges = len(timeline[0]['columnData'])
+        keywords = list(query.kw_list[:n_ranges])
+        if tidy:
+            # one row per range and point, ranges one after the other
+            cells = [point['columnData'][i] for i in range(n_ranges) for point in timeline]
+            df = pd.DataFrame({
+                'range': np.repeat(np.arange(n_ranges), len(timeline)),
+                'keyword': np.repeat(np.array(keywords, dtype=object), len(timeline)),
+                'date': pd.to_datetime(
+                    np.array([cell['time'] for cell in cells], dtype='float64'), unit='s'),
+                'value': np.array([cell['value'] for cell in cells], dtype=dtype),
+                'isPartial': np.array([cell.get('isPartial', False) for cell in cells], dtype=bool),
+            })
+            averages = pd.Series(
+                np.array(averages, dtype='float64'),
+                index=pd.MultiIndex.from_arrays([np.arange(n_ranges), keywords],
+                                                names=['range', 'keyword']),
+                name='average',
+            )
+            return df, averages
+
+        # a date and a value column for each range, the averages go in the first row
+        columns = dict()
+        for i, kw in enumerate(keywords):
+            label = f'[{i}] {kw}'
+            columns[f'{label} date'] = ['Average'] + [
+                point['columnData'][i]['formattedTime'] for point in timeline]
+            columns[f'{label} value'] = np.array(
+                [averages[i]] + [point['columnData'][i]['value'] for point in timeline], dtype=dtype)
+        return pd.DataFrame(columns)
 
     def interest_by_region(self, resolution='COUNTRY', inc_low_vol=False,
-                           inc_geo_code=False):
-        """Request data from Google's Interest by Region section and return a dataframe"""
+                           inc_geo_code=False, dtype='int64', output='pandas', query=None):
+        """Request data from Google's Interest by Region section and return a dataframe
+
+        With `inc_geo_code` the regions come with their 'geoCode', or with 'lat' and 'lng' columns for cities.
+        `dtype` is the type of the keyword columns, values go from 0 to 100 so 'uint8' is enough to hold them.
+        `output` selects the format of the result, see `pytrends.output`; outside of pandas the region names
+        are in a 'geoName' column. `query` is a `Query` built by `build_query`, defaults to the payload of the
+        last `build_payload` call.
+        """
+        check_output(output)
+        query = query or self._current_query()
 
-        # make the request
+        # make the request, leaving the widget untouched
         region_payload = dict()
-        if self.geo == '':
-            self.interest_by_region_widget['request'][
-                'resolution'] = resolution
-        elif self.geo == 'US' and resolution in ['DMA', 'CITY', 'REGION']:
-            self.interest_by_region_widget['request'][
-                'resolution'] = resolution
+        region_request = dict(query.interest_by_region_widget['request'])
+        if query.geo == '':
+            region_request['resolution'] = resolution
+        elif query.geo == 'US' and resolution in ['DMA', 'CITY', 'REGION']:
+            region_request['resolution'] = resolution
 
-        self.interest_by_region_widget['request'][
-            'includeLowSearchVolumeGeos'] = inc_low_vol
+        region_request['includeLowSearchVolumeGeos'] = inc_low_vol
 
         # convert to string as requests will mangle
-        region_payload['req'] = json.dumps(
-            self.interest_by_region_widget['request'])
-        region_payload['token'] = self.interest_by_region_widget['token']
+        region_payload['req'] = json.dumps(region_request)
+        region_payload['token'] = query.interest_by_region_widget['token']
         region_payload['tz'] = self.tz
 
         # parse returned json
@@ -354,130 +947,200 @@ class TrendReq(object):
             trim_chars=5,
             params=region_payload,
         )
-        df = pd.DataFrame(req_json['default']['geoMapData'])
-        if (df.empty):
-            return df
-
-        # rename the column with the search keyword
-        geo_column = 'geoCode' if 'geoCode' in df.columns else 'coordinates'
-        columns = ['geoName', geo_column, 'value']
-        df = df[columns].set_index(['geoName']).sort_index()
-        # split list columns into separate ones, remove brackets and split on comma
-        result_df = df['value'].apply(lambda x: pd.Series(
-            str(x).replace('[', '').replace(']', '').split(',')))
+        geo_map = req_json['default']['geoMapData']
+        if not geo_map:
+            return pd.DataFrame(geo_map) if output == 'pandas' else columns_output({}, output)
+
+        # build the region x keyword matrix straight from the json lists
+        names = np.array([region['geoName'] for region in geo_map], dtype=object)
+        order = np.argsort(names, kind='stable')
+        values = np.array([region['value'] for region in geo_map], dtype=dtype)[order]
+        index = pd.Index(names[order], name='geoName')
+
+        columns = dict()
+        if output != 'pandas':
+            columns['geoName'] = names[order]
         if inc_geo_code:
-            if geo_column in df.columns:
-                result_df[geo_column] = df[geo_column]
+            if 'geoCode' in geo_map[0]:
+                columns['geoCode'] = np.array(
+                    [region['geoCode'] for region in geo_map], dtype=object)[order]
+            elif 'coordinates' in geo_map[0]:
+                # cities come with their coordinates instead of a code
+                coordinates = np.array(
+                    [(region['coordinates']['lat'], region['coordinates']['lng'])
+                     for region in geo_map], dtype='float64')[order]
+                columns['lat'] = coordinates[:, 0]
+                columns['lng'] = coordinates[:, 1]
             else:
                 print('Could not find geo_code column; Skipping')
+        # name each column with its search term
+        for idx, kw in enumerate(query.kw_list):
+            columns[kw] = values[:, idx]
 
-        # rename each column with its search term
-        for idx, kw in enumerate(self.kw_list):
-            result_df[kw] = result_df[idx].astype('int')
-            del result_df[idx]
-
-        return result_df
+        if output != 'pandas':
+            return columns_output(columns, output)
+        return pd.DataFrame(columns, index=index)
 
-    def related_topics(self):
+    def related_topics(self, output='pandas', query=None):
         """Request data from Google's Related Topics section and return a dictionary of dataframes
 
         If no top and/or rising related topics are found, the value for the key "top" and/or "rising" will be None
+        `output` selects the format of the tables, see `pytrends.output`. `query` is a `Query` built by
+        `build_query`, defaults to the payload of the last `build_payload` call.
         """
+        check_output(output)
+        query = query or self._current_query()
+        return dict(self._related_topics(request_json, output=output)
+                    for request_json in query.related_topics_widget_list)
+
+    def _related_topics(self, request_json, output='pandas'):
+        """Request the Related Topics data of a single widget and return a (keyword, dictionary of dataframes) pair"""
+        # ensure we know which keyword we are looking at rather than relying on order
+        try:
+            kw = request_json['request']['restriction'][
+                'complexKeywordsRestriction']['keyword'][0]['value']
+        except KeyError:
+            kw = ''
+        # convert to string as requests will mangle
+        related_payload = {
+            'req': json.dumps(request_json['request']),
+            'token': request_json['token'],
+            'tz': self.tz,
+        }
 
-        # make the request
-        related_payload = dict()
-        result_dict = dict()
-        for request_json in self.related_topics_widget_list:
-            # ensure we know which keyword we are looking at rather than relying on order
-            try:
-                kw = request_json['request']['restriction'][
-                    'complexKeywordsRestriction']['keyword'][0]['value']
-            except KeyError:
-                kw = ''
-            # convert to string as requests will mangle
-            related_payload['req'] = json.dumps(request_json['request'])
-            related_payload['token'] = request_json['token']
-            related_payload['tz'] = self.tz
-
-            # parse the returned json
-            req_json = self._get_data(
-                url=TrendReq.RELATED_QUERIES_URL,
-                method=TrendReq.GET_METHOD,
-                trim_chars=5,
-                params=related_payload,
-            )
-
-            # top topics
-            try:
-                top_list = req_json['default']['rankedList'][0]['rankedKeyword']
-                df_top = pd.json_normalize(top_list, sep='_')
-            except KeyError:
-                # in case no top topics are found, the lines above will throw a KeyError
-                df_top = None
-
-            # rising topics
-            try:
-                rising_list = req_json['default']['rankedList'][1]['rankedKeyword']
-                df_rising = pd.json_normalize(rising_list, sep='_')
-            except KeyError:
-                # in case no rising topics are found, the lines above will throw a KeyError
-                df_rising = None
+        # parse the returned json
+        req_json = self._get_data(
+            url=TrendReq.RELATED_QUERIES_URL,
+            method=TrendReq.GET_METHOD,
+            trim_chars=5,
+            params=related_payload,
+        )
 
-            result_dict[kw] = {'rising': df_rising, 'top': df_top}
-        return result_dict
+        # top topics
+        try:
+            top_list = req_json['default']['rankedList'][0]['rankedKeyword']
+            df_top = self._ranked_topics(top_list, output)
+        except KeyError:
+            # in case no top topics are found, the lines above will throw a KeyError
+            df_top = None
 
-    def related_queries(self):
+        # rising topics
+        try:
+            rising_list = req_json['default']['rankedList'][1]['rankedKeyword']
+            df_rising = self._ranked_topics(rising_list, output)
+        except KeyError:
+            # in case no rising topics are found, the lines above will throw a KeyError
+            df_rising = None
+
+        return kw, {'rising': df_rising, 'top': df_top}
+
+    @staticmethod
+    def _ranked_topics(ranked_list, output):
+        """Return a ranked list of topics in `output` format, with their nested fields flattened"""
+        if output == 'pandas':
+            return pd.json_normalize(ranked_list, sep='_')
+        return records_output([flatten(topic) for topic in ranked_list], output)
+
+    def related_queries(self, output='pandas', query=None):
         """Request data from Google's Related Queries section and return a dictionary of dataframes
 
         If no top and/or rising related queries are found, the value for the key "top" and/or "rising" will be None
+        `output` selects the format of the tables, see `pytrends.output`. `query` is a `Query` built by
+        `build_query`, defaults to the payload of the last `build_payload` call.
         """
+        check_output(output)
+        query = query or self._current_query()
+        return dict(self._related_queries(request_json, output=output)
+                    for request_json in query.related_queries_widget_list)
+
+    def _related_queries(self, request_json, output='pandas'):
+        """Request the Related Queries data of a single widget and return a (keyword, dictionary of dataframes) pair"""
+        # ensure we know which keyword we are looking at rather than relying on order
+        try:
+            kw = request_json['request']['restriction'][
+                'complexKeywordsRestriction']['keyword'][0]['value']
+        except KeyError:
+            kw = ''
+        # convert to string as requests will mangle
+        related_payload = {
+            'req': json.dumps(request_json['request']),
+            'token': request_json['token'],
+            'tz': self.tz,
+        }
 
-        # make the request
-        related_payload = dict()
-        result_dict = dict()
-        for request_json in self.related_queries_widget_list:
-            # ensure we know which keyword we are looking at rather than relying on order
-            try:
-                kw = request_json['request']['restriction'][
-                    'complexKeywordsRestriction']['keyword'][0]['value']
-            except KeyError:
-                kw = ''
-            # convert to string as requests will mangle
-            related_payload['req'] = json.dumps(request_json['request'])
-            related_payload['token'] = request_json['token']
-            related_payload['tz'] = self.tz
-
-            # parse the returned json
-            req_json = self._get_data(
-                url=TrendReq.RELATED_QUERIES_URL,
-                method=TrendReq.GET_METHOD,
-                trim_chars=5,
-                params=related_payload,
-            )
+        # parse the returned json
+        req_json = self._get_data(
+            url=TrendReq.RELATED_QUERIES_URL,
+            method=TrendReq.GET_METHOD,
+            trim_chars=5,
+            params=related_payload,
+        )
 
-            # top queries
-            try:
-                top_df = pd.DataFrame(
-                    req_json['default']['rankedList'][0]['rankedKeyword'])
-                top_df = top_df[['query', 'value']]
-            except KeyError:
-                # in case no top queries are found, the lines above will throw a KeyError
-                top_df = None
-
-            # rising queries
-            try:
-                rising_df = pd.DataFrame(
-                    req_json['default']['rankedList'][1]['rankedKeyword'])
-                rising_df = rising_df[['query', 'value']]
-            except KeyError:
-                # in case no rising queries are found, the lines above will throw a KeyError
-                rising_df = None
+        # top queries
+        try:
+            top_df = self._ranked_queries(
+                req_json['default']['rankedList'][0]['rankedKeyword'], output)
+        except KeyError:
+            # in case no top queries are found, the lines above will throw a KeyError
+            top_df = None
 
-            result_dict[kw] = {'top': top_df, 'rising': rising_df}
-        return result_dict
+        # rising queries
+        try:
+            rising_df = self._ranked_queries(
+                req_json['default']['rankedList'][1]['rankedKeyword'], output)
+        except KeyError:
+            # in case no rising queries are found, the lines above will throw a KeyError
+            rising_df = None
+
+        return kw, {'top': top_df, 'rising': rising_df}
+
+    @staticmethod
+    def _ranked_queries(ranked_list, output):
+        """Return the query and value of a ranked list of queries in `output` format"""
+        if output == 'pandas':
+            return pd.DataFrame(ranked_list)[['query', 'value']]
+        return records_output(
+            [{'query': query['query'], 'value': query['value']} for query in ranked_list], output)
+
+    def explore_all(self, resolution='COUNTRY', inc_low_vol=False, inc_geo_code=False,
+                    dtype='int64', output='pandas', max_workers=4, query=None):
+        """Request every section of a payload at once and return them as an `ExploreResult`
+
+        The interest over time, interest by region and per keyword related topics and queries widgets are
+        requested concurrently by `max_workers` threads instead of one after the other. The arguments are those
+        of the section methods, a section whose widget Google didn't return is None.
+        """
+        check_output(output)
+        query = query or self._current_query()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            over_time = None
+            if query.interest_over_time_widget:
+                over_time = executor.submit(
+                    self._interest_over_time, query.interest_over_time_widget, query.kw_list, query.geo,
+                    dtype=dtype, output=output)
+            by_region = None
+            if query.interest_by_region_widget:
+                by_region = executor.submit(
+                    self.interest_by_region, resolution=resolution, inc_low_vol=inc_low_vol,
+                    inc_geo_code=inc_geo_code, dtype=dtype, output=output, query=query)
+            topics = [executor.submit(self._related_topics, request_json, output=output)
+                      for request_json in query.related_topics_widget_list]
+            queries = [executor.submit(self._related_queries, request_json, output=output)
+                       for request_json in query.related_queries_widget_list]
+            return ExploreResult(
+                interest_over_time=over_time.result() if over_time else None,
+                interest_by_region=by_region.result() if by_region else None,
+                related_topics=dict(future.result() for future in topics),
+                related_queries=dict(future.result() for future in queries),
+            )
 
-    def trending_searches(self, pn='united_states'):
-        """Request data from Google's Hot Searches section and return a dataframe"""
+    def trending_searches(self, pn='united_states', output='pandas'):
+        """Request data from Google's Hot Searches section and return a dataframe
+
+        `output` selects the format of the result, see `pytrends.output`; outside of pandas the searches are
+        in a 'title' column.
+        """
+        check_output(output)
 
         # make the request
         # forms become obsolete due to the new TRENDING_SEARCHES_URL
@@ -486,11 +1149,18 @@ class TrendReq(object):
             url=TrendReq.TRENDING_SEARCHES_URL,
             method=TrendReq.GET_METHOD
         )[pn]
+        if output != 'pandas':
+            return columns_output({'title': req_json}, output)
         result_df = pd.DataFrame(req_json)
         return result_df
 
-    def today_searches(self, pn='US'):
-        """Request data from Google Daily Trends section and returns a dataframe"""
+    def today_searches(self, pn='US', output='pandas'):
+        """Request data from Google Daily Trends section and returns a dataframe
+
+        `output` selects the format of the result, see `pytrends.output`; outside of pandas every field of the
+        titles of the searches is kept.
+        """
+        check_output(output)
         forms = {'ns': 15, 'geo': pn, 'tz': '-180', 'hl': self.hl}
         req_json = self._get_data(
             url=TrendReq.TODAY_SEARCHES_URL,
@@ -500,11 +1170,17 @@ class TrendReq(object):
             **self.requests_args
         )['default']['trendingSearchesDays'][0]['trendingSearches']
         # parse the returned json
+        if output != 'pandas':
+            return records_output([trend['title'] for trend in req_json], output)
         result_df = pd.DataFrame(trend['title'] for trend in req_json)
         return result_df.iloc[:, -1]
 
-    def realtime_trending_searches(self, pn='US', cat='all', count =300):
-        """Request data from Google Realtime Search Trends section and returns a dataframe"""
+    def realtime_trending_searches(self, pn='US', cat='all', count =300, output='pandas'):
+        """Request data from Google Realtime Search Trends section and returns a dataframe
+
+        `output` selects the format of the result, see `pytrends.output`.
+        """
+        check_output(output)
         # Don't know what some of the params mean here, followed the nodejs library
         # https://github.com/pat310/google-trends-api/ 's implemenration
 
@@ -536,13 +1212,19 @@ class TrendReq(object):
         wanted_keys = ["entityNames", "title"]
 
         final_json = [{ key: ts[key] for key in ts.keys() if key in wanted_keys} for ts in req_json ]
+        if output != 'pandas':
+            return records_output(final_json, output)
 
         result_df = pd.DataFrame(final_json)
 
         return result_df
 
-    def top_charts(self, date, hl='en-US', tz=300, geo='GLOBAL'):
-        """Request data from Google's Top Charts section and return a dataframe"""
+    def top_charts(self, date, hl='en-US', tz=300, geo='GLOBAL', output='pandas'):
+        """Request data from Google's Top Charts section and return a dataframe
+
+        `output` selects the format of the result, see `pytrends.output`.
+        """
+        check_output(output)
 
         try:
             date = int(date)
@@ -562,7 +1244,10 @@ class TrendReq(object):
             params=chart_payload
         )
         try:
-            df = pd.DataFrame(req_json['topCharts'][0]['listItems'])
+            list_items = req_json['topCharts'][0]['listItems']
+            if output != 'pandas':
+                return records_output(list_items, output)
+            df = pd.DataFrame(list_items)
         except IndexError:
             df = None
         return df
@@ -582,6 +1267,32 @@ class TrendReq(object):
         )['default']['topics']
         return req_json
 
+    def suggestions_many(self, keywords, limit=1, max_workers=4, output='pandas'):
+        """Request the suggestions of many keywords and return them as a single table
+
+        Keywords are normalized (lowercased, with single spaces) and each distinct one is only requested once,
+        by `max_workers` threads; with a `response_cache` the suggestions of keywords seen before aren't
+        requested again. The table has the 'keyword' (as given), 'mid', 'title' and 'type' columns with the
+        first `limit` suggestions of every keyword, in the order of `keywords`, and a row of None values for
+        keywords without any suggestion.
+        """
+        check_output(output)
+        keywords = list(keywords)
+        normalized = [' '.join(kw.split()).lower() for kw in keywords]
+        distinct = [kw for kw in dict.fromkeys(normalized) if kw]
+        suggestions = dict(zip(distinct, _bounded_map(self.suggestions, distinct, max_workers)))
+        records = list()
+        for kw, key in zip(keywords, normalized):
+            topics = suggestions.get(key)
+            records.extend(
+                {'keyword': kw, 'mid': topic.get('mid'), 'title': topic.get('title'), 'type': topic.get('type')}
+                for topic in (topics or ())[:limit])
+            if not topics:
+                records.append({'keyword': kw, 'mid': None, 'title': None, 'type': None})
+        if output != 'pandas':
+            return records_output(records, output)
+        return pd.DataFrame(records, columns=['keyword', 'mid', 'title', 'type'])
+
     def categories(self):
         """Request available categories data from Google's API and return a dictionary"""
 
@@ -595,6 +1306,18 @@ class TrendReq(object):
         )
         return req_json
 
+    def category_index(self):
+        """Return the category tree in the language of the instance as a `pytrends.categories.CategoryIndex`
+
+        The index of each language is built once per process, and with a `response_cache` the tree is
+        downloaded again only once its cached response expired.
+        """
+        index = TrendReq.CATEGORY_INDEXES.get(self.hl)
+        if index is None:
+            index = CategoryIndex(self.categories())
+            TrendReq.CATEGORY_INDEXES[self.hl] = index
+        return index
+
     def get_historical_interest(self, *args, **kwargs):
         raise NotImplementedError(
             """This method has been removed for incorrectness. It will be removed completely in v5.
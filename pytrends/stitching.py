@@ -0,0 +1,129 @@
+from datetime import date, datetime
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from pytrends.request import TrendReq
+
+# longest window Google answers at each granularity, step between two points
+# and the default overlap between consecutive windows
+GRANULARITIES = {
+    'hourly': {
+        'window': pd.Timedelta(days=7),
+        'step': pd.Timedelta(hours=1),
+        'overlap': pd.Timedelta(days=1),
+        'format': '%Y-%m-%dT%H',
+    },
+    'daily': {
+        'window': pd.Timedelta(days=269),
+        'step': pd.Timedelta(days=1),
+        'overlap': pd.Timedelta(days=30),
+        'format': '%Y-%m-%d',
+    },
+}
+
+
+def _granularity(granularity: str) -> dict:
+    try:
+        return GRANULARITIES[granularity]
+    except KeyError:
+        raise ValueError(f'granularity must be one of {", ".join(GRANULARITIES)}, not {granularity!r}')
+
+
+def plan_windows(start: Union[date, datetime, str],
+                 stop: Union[date, datetime, str],
+                 granularity: str = 'daily',
+                 overlap: Optional[pd.Timedelta] = None) -> List[str]:
+    """Splits the range [start, stop] into the timeframes of windows short
+    enough for Google to return data at the given granularity.
+
+    Consecutive windows share `overlap` worth of points (one day for hourly
+    data and 30 days for daily data by default), which are used to bring them
+    onto a single scale. Dates are in UTC, like Google's timeframes.
+    """
+    spec = _granularity(granularity)
+    overlap = spec['overlap'] if overlap is None else pd.Timedelta(overlap)
+    if not spec['step'] <= overlap < spec['window']:
+        raise ValueError(f'overlap must be between {spec["step"]} and {spec["window"]}')
+    start = pd.Timestamp(start).floor(spec['step'])
+    stop = pd.Timestamp(stop).floor(spec['step'])
+
+    timeframes = []
+    window_start = start
+    while True:
+        # both ends of a timeframe are included
+        window_stop = min(window_start + spec['window'] - spec['step'], stop)
+        timeframes.append(
+            f'{window_start.strftime(spec["format"])} {window_stop.strftime(spec["format"])}')
+        if window_stop >= stop:
+            return timeframes
+        window_start = window_stop - overlap + spec['step']
+
+
+def stitch(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Brings overlapping interest over time windows onto a single scale and
+    joins them into one DataFrame.
+
+    Each window is scaled by the ratio between the total interest of the
+    previous window and its own over the points they share, and the ratios
+    are chained along the windows. Windows that can't be compared to the
+    previous one (no overlap or no interest during it) keep its scale. Points
+    found in several windows are averaged, and the result is scaled so its
+    highest value is 100. A point is partial if it is partial in any window.
+    """
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    long = pd.concat(frames, keys=range(len(frames)), names=['window', 'date'])
+    is_partial = long.pop('isPartial').astype(bool) if 'isPartial' in long else None
+
+    # total interest of each point of each window, matched with the same point of the previous window
+    totals = long.sum(axis=1).rename('total').reset_index()
+    previous = totals.assign(window=totals['window'] + 1)
+    shared = totals.merge(previous, on=['window', 'date'], suffixes=('', '_previous'))
+    sums = shared.groupby('window')[['total', 'total_previous']].sum()
+    ratios = (sums['total_previous'] / sums['total']).reindex(range(len(frames)))
+    ratios = ratios.where(np.isfinite(ratios) & (ratios > 0), 1.0)
+    scales = ratios.cumprod()
+
+    scaled = long.mul(scales.to_numpy()[long.index.codes[0]], axis=0)
+    result = scaled.groupby(level='date').mean()
+    highest = result.to_numpy().max()
+    if highest > 0:
+        result = result * (100 / highest)
+    if is_partial is not None:
+        result['isPartial'] = is_partial.groupby(level='date').any()
+    return result
+
+
+def get_stitched_data(kw_list: List[str],
+                      start: Union[date, datetime, str],
+                      stop: Union[date, datetime, str],
+                      granularity: str = 'daily',
+                      pytrends: Optional[TrendReq] = None,
+                      cat: int = 0,
+                      geo: str = '',
+                      gprop: str = '',
+                      overlap: Optional[pd.Timedelta] = None,
+                      max_workers: int = 4) -> pd.DataFrame:
+    """Fetches interest over time of up to 5 keywords for any range at an
+    hourly or daily granularity, and returns it on a single scale.
+
+    Google only returns hourly data for windows of up to 7 days and daily
+    data for windows of up to 269 days. The range is split into overlapping
+    windows (see plan_windows) fetched by max_workers threads of `pytrends`
+    (a new TrendReq by default, pass one to use proxies or a rate limiter),
+    then the windows are stitched together (see stitch).
+
+    Returns:
+        (pd.DataFrame): One column per keyword, scaled so the highest value
+            is 100, and an 'isPartial' column, indexed by date.
+    """
+    pytrends = pytrends or TrendReq()
+    payloads = (
+        {'kw_list': kw_list, 'timeframe': timeframe, 'cat': cat, 'geo': geo, 'gprop': gprop}
+        for timeframe in plan_windows(start, stop, granularity=granularity, overlap=overlap)
+    )
+    frames = [df for _, df in pytrends.iter_interest_over_time(payloads, max_workers=max_workers)]
+    return stitch(frames)
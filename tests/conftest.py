@@ -1,6 +1,11 @@
+import json
+from urllib.parse import parse_qs, urlparse
+
 import pytest
 from responses import RequestsMock
 
+from pytrends.request import TrendReq, BASE_TRENDS_URL
+
 
 @pytest.fixture
 def mocked_responses():
@@ -9,3 +14,98 @@ def mocked_responses():
     )
     with requests_mock as mocked_responses:
         yield mocked_responses
+
+
+class FakeTrends:
+    """
+    Small fake of the Google Trends backend used to test code that sends many payloads.
+
+    `volumes` is a dict of keyword -> raw search volume for each of the `dates`. Like Google,
+    the interest over time of a payload is scaled so that its highest value is 100.
+    `requests` counts the requests made to each url and `items` records the comparison items of every payload.
+    """
+
+    def __init__(self, volumes, dates):
+        self.volumes = volumes
+        self.dates = dates
+        self.requests = {}
+        self.items = []
+
+    def _count(self, request):
+        url = request.url.split('?')[0]
+        self.requests[url] = self.requests.get(url, 0) + 1
+        return parse_qs(urlparse(request.url).query)
+
+    def explore(self, request):
+        params = self._count(request)
+        req = json.loads(params['req'][0])
+        items = req['comparisonItem']
+        self.items.append(items)
+        widgets = [
+            {'id': 'TIMESERIES', 'token': 'token', 'request': {'comparisonItem': items}},
+            {'id': 'GEO_MAP', 'token': 'token', 'request': {'comparisonItem': items}},
+        ]
+        for index, item in enumerate(items):
+            widgets.append({
+                'id': f'RELATED_QUERIES_{index}', 'token': 'token',
+                'request': {'restriction': {'complexKeywordsRestriction': {
+                    'keyword': [{'type': 'BROAD', 'value': item['keyword']}]}}}
+            })
+        return 200, {}, ')]}\'' + json.dumps({'widgets': widgets})
+
+    def multiline(self, request):
+        params = self._count(request)
+        items = json.loads(params['req'][0])['comparisonItem']
+        raw = [self.volumes[item['keyword']] for item in items]
+        top = max(max(values) for values in raw) or 1
+        timeline = [
+            {
+                'time': str(int(date.timestamp())),
+                'value': [round(values[index] * 100 / top) for values in raw],
+                'isPartial': index == len(self.dates) - 1,
+            }
+            for index, date in enumerate(self.dates)
+        ]
+        return 200, {}, ')]}\',\n' + json.dumps({'default': {'timelineData': timeline}})
+
+    def geo_map(self, request):
+        params = self._count(request)
+        items = json.loads(params['req'][0])['comparisonItem']
+        totals = [sum(self.volumes[item['keyword']]) for item in items]
+        top = max(totals) or 1
+        value = [round(total * 100 / top) for total in totals]
+        geo_map = [{'geoCode': 'US', 'geoName': 'United States', 'value': value}]
+        return 200, {}, ')]}\',\n' + json.dumps({'default': {'geoMapData': geo_map}})
+
+    def related(self, request):
+        params = self._count(request)
+        keyword = json.loads(params['req'][0])['restriction'][
+            'complexKeywordsRestriction']['keyword'][0]['value']
+        ranked_list = [
+            {'rankedKeyword': [{'query': f'{keyword} near me', 'value': 100}]},
+            {'rankedKeyword': [{'query': f'{keyword} day', 'value': 250}]},
+        ]
+        return 200, {}, ')]}\',\n' + json.dumps({'default': {'rankedList': ranked_list}})
+
+
+@pytest.fixture
+def fake_trends():
+    """Yields a factory that registers a `FakeTrends` backend with the given volumes and dates"""
+    with RequestsMock(assert_all_requests_are_fired=False) as requests_mock:
+        def factory(volumes, dates):
+            fake = FakeTrends(volumes, dates)
+            requests_mock.add(url=f'{BASE_TRENDS_URL}/explore/', method='GET')
+            requests_mock.add_callback(
+                'POST', TrendReq.GENERAL_URL, callback=fake.explore,
+                content_type='application/json')
+            requests_mock.add_callback(
+                'GET', TrendReq.INTEREST_OVER_TIME_URL, callback=fake.multiline,
+                content_type='application/json')
+            requests_mock.add_callback(
+                'GET', TrendReq.INTEREST_BY_REGION_URL, callback=fake.geo_map,
+                content_type='application/json')
+            requests_mock.add_callback(
+                'GET', TrendReq.RELATED_QUERIES_URL, callback=fake.related,
+                content_type='application/json')
+            return fake
+        yield factory
@@ -0,0 +1,73 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from pytrends.async_request import AsyncTrendReq
+from pytrends.request import TrendReq, BASE_TRENDS_URL
+
+
+@pytest.mark.vcr
+def test_related_queries():
+    async def fetch():
+        async with AsyncTrendReq(max_concurrency=2) as pytrend:
+            await pytrend.build_payload(kw_list=['pizza', 'bagel'], timeframe='2021-01-01 2021-12-31')
+            return await pytrend.related_queries()
+
+    result = asyncio.run(fetch())
+    assert set(result.keys()) == {'pizza', 'bagel'}
+    assert set(result['pizza'].keys()) == {'top', 'rising'}
+    assert result['pizza']['top']['query'][0] == 'pizza hut'
+
+
+@pytest.mark.vcr
+def test_related_topics():
+    async def fetch():
+        async with AsyncTrendReq() as pytrend:
+            await pytrend.build_payload(kw_list=['pizza'], timeframe='2021-01-01 2021-12-31')
+            return await pytrend.related_topics()
+
+    result = asyncio.run(fetch())
+    assert set(result.keys()) == {'pizza'}
+    assert set(result['pizza'].keys()) == {'top', 'rising'}
+
+
+def test_explore_all(fake_trends):
+    fake_trends({'pizza': [3, 1, 2]}, pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03']))
+
+    async def fetch():
+        async with AsyncTrendReq() as pytrend:
+            query = await pytrend.build_query(kw_list=['pizza'])
+            return await pytrend.explore_all(query=query)
+
+    result = asyncio.run(fetch())
+    assert result.interest_over_time['pizza'].tolist() == [100, 33, 67]
+    assert result.interest_by_region.loc['United States', 'pizza'] == 100
+    assert result.related_queries['pizza']['top']['query'][0] == 'pizza near me'
+
+
+def test_explore_all_without_payload():
+    async def fetch():
+        async with AsyncTrendReq() as pytrend:
+            return await pytrend.explore_all()
+
+    assert asyncio.run(fetch()) == (None, None, {}, {})
+
+
+def test_trending_searches(mocked_responses):
+    mocked_responses.add(
+        url=f'{BASE_TRENDS_URL}/explore/?geo=US',
+        method='GET',
+    )
+    mocked_responses.add(
+        url=TrendReq.TRENDING_SEARCHES_URL,
+        method='GET',
+        json={'united_states': ['term 1', 'term 2']}
+    )
+
+    async def fetch():
+        async with AsyncTrendReq() as pytrend:
+            return await pytrend.trending_searches()
+
+    result = asyncio.run(fetch())
+    assert list(result[0]) == ['term 1', 'term 2']
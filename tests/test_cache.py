@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+import json
+
+import pandas as pd
+import pytest
+
+from pytrends.cache import FileCache, ResponseCache, SQLiteCache, payload_key
+from pytrends.request import TrendReq
+
+
+def request_params(*timeframes):
+    return {
+        'req': json.dumps({'comparisonItem': [{'keyword': 'pizza', 'time': t} for t in timeframes]}),
+        'token': 'token',
+        'tz': 360,
+    }
+
+
+def test_payload_key_is_canonical():
+    assert payload_key({'req': '{"a": 1, "b": 2}', 'tz': 360}) == \
+        payload_key({'tz': 360, 'req': '{"b": 2, "a": 1}'})
+
+
+def test_response_cache_key_ignores_token():
+    params = request_params('today 5-y')
+    assert ResponseCache.key('url', params) == ResponseCache.key('url', dict(params, token='other'))
+    assert ResponseCache.key('url', params) != ResponseCache.key('other', params)
+
+
+def test_response_cache_ttl_by_timeframe():
+    cache = ResponseCache(ttl={'rolling': 10})
+    assert cache.ttl(request_params('2021-01-01 2021-01-31')) == ResponseCache.TTL['historical']
+    assert cache.ttl(request_params('2017-02-06T10 2017-02-12T07')) == ResponseCache.TTL['historical']
+    assert cache.ttl(request_params('today 5-y')) == 10
+    assert cache.ttl(request_params('now 1-H')) == ResponseCache.TTL['realtime']
+    assert cache.ttl(request_params('2021-01-01 2021-01-31', 'now 7-d')) == ResponseCache.TTL['realtime']
+    assert cache.ttl({'hl': 'en-US'}) == ResponseCache.TTL['reference']
+
+
+def widget_params(time, resolution):
+    """Parameters of an interest over time widget request, with the timeframe resolved by Google"""
+    request = {
+        'time': time, 'resolution': resolution, 'locale': 'en-US',
+        'comparisonItem': [{'geo': {}, 'complexKeywordsRestriction': {
+            'keyword': [{'type': 'BROAD', 'value': 'pizza'}]}}],
+        'requestOptions': {'property': '', 'backend': 'IZG', 'category': 0},
+        'userConfig': {'userType': 'USER_TYPE_SCRAPER'},
+    }
+    return {'req': json.dumps(request), 'token': 'token', 'tz': 360}
+
+
+def test_response_cache_ttl_of_resolved_timeframes():
+    cache = ResponseCache()
+    now = datetime.now(timezone.utc)
+    week_ago = now - timedelta(days=7)
+    # 'now 7-d' and 'now 1-H'
+    assert cache.ttl(widget_params(
+        f'{week_ago:%Y-%m-%dT%H} {now:%Y-%m-%dT%H}', 'HOUR')) == ResponseCache.TTL['realtime']
+    assert cache.ttl(widget_params(
+        ' '.join([now.strftime('%Y-%m-%dT%H\\:%M\\:00')] * 2), 'MINUTE')) == ResponseCache.TTL['realtime']
+    # 'today 1-m', and a past week of hourly data
+    assert cache.ttl(widget_params(
+        f'{week_ago:%Y-%m-%d} {now:%Y-%m-%d}', 'DAY')) == ResponseCache.TTL['rolling']
+    assert cache.ttl(widget_params('2017-02-06T10 2017-02-12T07', 'HOUR')) == ResponseCache.TTL['historical']
+
+
+@pytest.fixture(params=['sqlite', 'file'])
+def make_cache(request, tmp_path):
+    def factory(**kwargs):
+        if request.param == 'sqlite':
+            return SQLiteCache(str(tmp_path / 'cache.sqlite'), **kwargs)
+        return FileCache(str(tmp_path / 'cache'), **kwargs)
+    return factory
+
+
+def test_response_cache_expires(make_cache):
+    now = [1000.0]
+    cache = make_cache(timer=lambda: now[0])
+    cache.set('key', '{"value": 1}', ttl=10)
+    assert cache.get('key') == '{"value": 1}'
+    now[0] += 10
+    assert cache.get('key') is None
+
+
+def test_response_cache_evicts_least_recently_used(make_cache):
+    now = [1000.0]
+    cache = make_cache(max_size=250, timer=lambda: now[0])
+    for key in ('a', 'b', 'c'):
+        cache.set(key, 'x' * 100, ttl=60)
+        now[0] += 1
+    assert cache.get('a') is None
+    assert cache.get('c') == 'x' * 100
+    cache.clear()
+    assert cache.get('c') is None
+
+
+def test_interest_over_time_uses_response_cache(fake_trends, tmp_path):
+    dates = pd.to_datetime(['2021-01-01', '2021-01-02'])
+    fake = fake_trends({'pizza': [1, 2]}, dates)
+    pytrend = TrendReq(response_cache=SQLiteCache(str(tmp_path / 'cache.sqlite')))
+    pytrend.build_payload(kw_list=['pizza'], timeframe='2021-01-01 2021-01-02')
+    first = pytrend.interest_over_time()
+    pytrend.build_payload(kw_list=['pizza'], timeframe='2021-01-01 2021-01-02')
+    second = pytrend.interest_over_time()
+    assert fake.requests[TrendReq.GENERAL_URL] == 2
+    assert fake.requests[TrendReq.INTEREST_OVER_TIME_URL] == 1
+    pd.testing.assert_frame_equal(first, second)
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from pytrends.categories import CategoryIndex
+from pytrends.request import TrendReq, BASE_TRENDS_URL
+
+TREE = {
+    'name': 'All categories', 'id': 0, 'children': [
+        {'name': 'Computers & Electronics', 'id': 5, 'children': [
+            {'name': 'Programming', 'id': 31},
+            {'name': 'Software', 'id': 32, 'children': [
+                {'name': 'Programming', 'id': 31},
+            ]},
+        ]},
+        {'name': 'Arts & Entertainment', 'id': 3, 'children': [
+            {'name': 'Comics', 'id': 1264},
+        ]},
+    ],
+}
+
+
+def test_category_index():
+    index = CategoryIndex(TREE)
+    assert len(index) == 6
+    assert 31 in index and 7 not in index
+    assert index.root.name == 'All categories'
+    assert index[5].children == (31, 32)
+    assert index.ids('programming') == (31, )
+    assert index.ids('Nope') == ()
+    # the category found under two parents is kept where it was first seen
+    assert index.parent(31).name == 'Computers & Electronics'
+    assert index.parent(0) is None
+    assert [category.name for category in index.children(3)] == ['Comics']
+    assert [category.id for category in index.path(1264)] == [0, 3, 1264]
+    assert [category.id for category in index] == [0, 5, 31, 32, 3, 1264]
+
+
+def test_category_index_is_built_once_per_language(mocked_responses, monkeypatch):
+    monkeypatch.setattr(TrendReq, 'CATEGORY_INDEXES', dict())
+    mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    mocked_responses.add(
+        url=TrendReq.CATEGORIES_URL,
+        method='GET',
+        body=')]}\',\n' + json.dumps(TREE),
+        content_type='application/json',
+    )
+    index = TrendReq().category_index()
+    assert index[32].path == (0, 5, 32)
+    assert TrendReq().category_index() is index
+    assert len(mocked_responses.calls) == 2
+    with pytest.raises(KeyError):
+        index[7]
@@ -0,0 +1,109 @@
+import pandas as pd
+import pytest
+import requests
+
+from pytrends import dailydata
+from pytrends.exceptions import ResponseError
+from pytrends.request import TrendReq
+
+
+@pytest.fixture
+def fake_interest_over_time(monkeypatch):
+    """Replaces the requests of interest over time by constant data, returns the list of requested payloads"""
+    payloads = []
+
+    def fake(self, payload, dtype='int64', output='pandas'):
+        payloads.append(payload)
+        start, stop = payload['timeframe'].split(' ')
+        # a single request covering several months gets monthly data
+        freq = 'D' if start[:7] == stop[:7] else 'MS'
+        index = pd.date_range(start, stop, freq=freq, name='date')
+        columns = {kw: [50 + i] * len(index) for i, kw in enumerate(payload['kw_list'])}
+        return payload, pd.DataFrame(dict(columns, isPartial=False), index=index)
+
+    monkeypatch.setattr(TrendReq, '_payload_interest_over_time', fake)
+    monkeypatch.setattr(dailydata, 'sleep', lambda seconds: None)
+    return payloads
+
+
+def test_get_daily_data(fake_interest_over_time):
+    df = dailydata.get_daily_data('pizza', 2021, 1, 2021, 3, verbose=False, wait_time=0)
+    assert list(df.columns) == ['pizza_unscaled', 'pizza_monthly', 'isPartial', 'scale', 'pizza']
+    assert len(df) == 31 + 28 + 31
+    assert (df['pizza'] == 25).all()
+    # the monthly data and one request per month
+    assert len(fake_interest_over_time) == 4
+
+
+def test_get_daily_data_words(fake_interest_over_time):
+    df = dailydata.get_daily_data(['pizza', 'bagel'], 2021, 1, 2021, 2, verbose=False, wait_time=0)
+    assert (df['pizza'] == 25).all()
+    assert (df['bagel'] == 51 * 51 / 100).all()
+    assert 'bagel_scale' in df.columns
+    assert all(payload['kw_list'] == ['pizza', 'bagel'] for payload in fake_interest_over_time)
+
+
+def test_get_daily_data_skips_empty_months(fake_interest_over_time, monkeypatch):
+    fake = TrendReq._payload_interest_over_time
+
+    def without_february(self, payload, dtype='int64', output='pandas'):
+        if payload['timeframe'] == '2021-02-01 2021-02-28':
+            return payload, pd.DataFrame()
+        return fake(self, payload, dtype=dtype, output=output)
+
+    monkeypatch.setattr(TrendReq, '_payload_interest_over_time', without_february)
+    df = dailydata.get_daily_data('pizza', 2021, 1, 2021, 3, verbose=False, wait_time=0)
+    assert len(df) == 31 + 31
+    assert (df['pizza'] == 25).all()
+
+
+def test_get_daily_data_resumes_from_checkpoint(fake_interest_over_time, tmp_path):
+    months = dailydata.iter_daily_data('pizza', 2021, 1, 2021, 6, verbose=False, wait_time=0,
+                                       max_workers=1, checkpoint_dir=tmp_path)
+    next(months)
+    months.close()
+    assert len(fake_interest_over_time) < 7
+    df = dailydata.get_daily_data('pizza', 2021, 1, 2021, 6, verbose=False, wait_time=0,
+                                  checkpoint_dir=tmp_path)
+    assert len(df) == 181
+    # the monthly data and the months fetched by the first run aren't requested again
+    timeframes = [payload['timeframe'] for payload in fake_interest_over_time]
+    assert len(timeframes) == len(set(timeframes)) == 7
+
+
+def test_get_daily_data_requests_partial_data_again(fake_interest_over_time, monkeypatch, tmp_path):
+    fake = TrendReq._payload_interest_over_time
+
+    def partial_march(self, payload, dtype='int64', output='pandas'):
+        payload, df = fake(self, payload, dtype=dtype, output=output)
+        # March is the current month, its last day isn't over
+        if payload['timeframe'].endswith('2021-03-31'):
+            df.loc[df.index[-1], 'isPartial'] = True
+        return payload, df
+
+    monkeypatch.setattr(TrendReq, '_payload_interest_over_time', partial_march)
+    for _ in range(2):
+        dailydata.get_daily_data('pizza', 2021, 1, 2021, 3, verbose=False, wait_time=0,
+                                 checkpoint_dir=tmp_path)
+    timeframes = [payload['timeframe'] for payload in fake_interest_over_time]
+    # January and February are read from the checkpoints, the monthly data and March are requested again
+    assert sorted(timeframes) == [
+        '2021-01-01 2021-01-31', '2021-01-01 2021-03-31', '2021-01-01 2021-03-31',
+        '2021-02-01 2021-02-28', '2021-03-01 2021-03-31', '2021-03-01 2021-03-31',
+    ]
+
+
+def test_get_daily_data_raises_after_retries(monkeypatch):
+    attempts = []
+
+    def failing(self, payload, dtype='int64', output='pandas'):
+        attempts.append(payload)
+        response = requests.Response()
+        response.status_code = 500
+        raise ResponseError.from_response(response)
+
+    monkeypatch.setattr(TrendReq, '_payload_interest_over_time', failing)
+    monkeypatch.setattr(dailydata, 'sleep', lambda seconds: None)
+    with pytest.raises(ResponseError):
+        dailydata.get_daily_data('pizza', 2021, 1, 2021, 3, verbose=False, wait_time=0, retries=2)
+    assert len(attempts) == 3
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from pytrends import planner
+from pytrends.planner import QuerySpec
+from pytrends.request import TrendReq
+
+
+def test_plan_payloads():
+    specs = [QuerySpec(f'kw{i}') for i in range(7)] + [
+        QuerySpec('kw0'),
+        QuerySpec('kw0', geo='US'),
+        QuerySpec('kw0', timeframe='today 3-m'),
+        QuerySpec('kw0', gprop='news'),
+    ]
+    payloads = planner.plan_payloads(specs)
+    assert payloads == [
+        [QuerySpec(f'kw{i}') for i in range(5)],
+        [QuerySpec('kw5'), QuerySpec('kw6'), QuerySpec('kw0', geo='US')],
+        [QuerySpec('kw0', timeframe='today 3-m')],
+        [QuerySpec('kw0', gprop='news')],
+    ]
+
+
+def test_get_interest_over_time(fake_trends):
+    fake = fake_trends({'pizza': [3, 1, 2], 'bagel': [1, 1, 1], 'taco': [2, 4, 1]},
+                       pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03']))
+    specs = [
+        QuerySpec('pizza'),
+        QuerySpec('bagel', geo='US'),
+        QuerySpec('pizza'),
+        QuerySpec('taco', timeframe='today 3-m'),
+    ]
+    results = planner.get_interest_over_time(specs)
+    assert list(results) == [QuerySpec('pizza'), QuerySpec('bagel', geo='US'),
+                             QuerySpec('taco', timeframe='today 3-m')]
+    # pizza and bagel share a payload and its scale
+    assert results[QuerySpec('pizza')]['pizza'].tolist() == [100, 33, 67]
+    assert results[QuerySpec('bagel', geo='US')]['bagel'].tolist() == [33, 33, 33]
+    assert results[QuerySpec('taco', timeframe='today 3-m')]['taco'].tolist() == [50, 100, 25]
+    assert list(results[QuerySpec('pizza')].columns) == ['pizza', 'isPartial']
+    assert fake.requests[TrendReq.GENERAL_URL] == 2
+    assert fake.requests[TrendReq.INTEREST_OVER_TIME_URL] == 2
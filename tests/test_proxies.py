@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from pytrends import exceptions
+from pytrends.proxies import ProxyPool
+from pytrends.request import TrendReq, BASE_TRENDS_URL
+
+
+def test_proxy_pool_prefers_healthy_proxies():
+    pool = ProxyPool(['https://a:80', 'https://b:80', 'https://c:80'])
+    proxies = [pool.acquire() for _ in range(3)]
+    # unmeasured proxies are tried first
+    assert sorted(proxies) == ['https://a:80', 'https://b:80', 'https://c:80']
+    pool.release('https://a:80', latency=2.0)
+    pool.release('https://b:80', latency=0.5)
+    pool.release('https://c:80', latency=1.0)
+    assert pool.acquire() == 'https://b:80'
+    # b has a request in flight now, so it costs as much as c and c has served less requests
+    assert pool.acquire() == 'https://c:80'
+
+
+def test_proxy_pool_quarantines_and_probes(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr('pytrends.proxies.time.monotonic', lambda: now[0])
+    pool = ProxyPool(['https://a:80', 'https://b:80'], cooldown=10)
+    proxy = pool.acquire()
+    pool.release(proxy, error='throttled')
+    other = pool.acquire()
+    assert other != proxy
+    pool.release(other, error='failed')
+    with pytest.raises(exceptions.NoProxyAvailableError):
+        pool.acquire()
+    assert pool.stats()[proxy]['throttled'] == 1
+    # once the cooldown is over a single probe request is allowed
+    now[0] = 10.0
+    assert pool.acquire() == proxy
+    assert pool.acquire() == other
+    with pytest.raises(exceptions.NoProxyAvailableError):
+        pool.acquire()
+    pool.release(proxy, error='failed')
+    assert pool.stats()[proxy]['quarantined_for'] == 20
+    pool.release(other, latency=0.1)
+    assert pool.acquire() == other
+
+
+def test_proxy_error_quarantines_proxy(mocked_responses):
+    mocked_responses.add(
+        url=f'{BASE_TRENDS_URL}/explore/?geo=US',
+        method='GET',
+        body=requests.exceptions.ProxyError('Fake proxy error'),
+    )
+    mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    mocked_responses.add(
+        url=TrendReq.TRENDING_SEARCHES_URL,
+        method='GET',
+        json={'united_states': ['term 1', 'term 2']}
+    )
+    pytrend = TrendReq(proxies=['https://a:80', 'https://b:80'])
+    pytrend.trending_searches()
+    stats = pytrend.proxy_pool.stats()
+    assert stats['https://a:80']['quarantined_for'] > 0
+    assert stats['https://a:80']['requests'] == 1
+    assert stats['https://b:80']['requests'] == 1
+    assert stats['https://b:80']['in_flight'] == 0
+
+
+def test_proxy_pool_waits_for_quarantine_and_probe():
+    pool = ProxyPool(['https://a:80'], cooldown=0.2)
+    pool.release(pool.acquire(), error='throttled')
+    with pytest.raises(exceptions.NoProxyAvailableError):
+        pool.acquire(timeout=0.05)
+    start = time.monotonic()
+    probe = pool.acquire(timeout=None)
+    assert time.monotonic() - start >= 0.1
+    # other requests wait for the probe request instead of failing
+    acquired = []
+    waiting = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+    waiting.start()
+    time.sleep(0.05)
+    assert acquired == []
+    pool.release(probe, latency=0.1)
+    waiting.join()
+    assert acquired == ['https://a:80']
+
+
+def test_single_proxy_is_reused_after_429(mocked_responses):
+    mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    mocked_responses.add(url=TrendReq.TRENDING_SEARCHES_URL, method='GET', status=429)
+    mocked_responses.add(
+        url=TrendReq.TRENDING_SEARCHES_URL,
+        method='GET',
+        json={'united_states': ['term 1', 'term 2']}
+    )
+    pytrend = TrendReq(proxies=ProxyPool(['https://a:80'], cooldown=0.2))
+    with pytest.raises(exceptions.TooManyRequestsError):
+        pytrend.trending_searches()
+    # the next request waits for the quarantine to end instead of failing
+    df = pytrend.trending_searches()
+    assert df[0].tolist() == ['term 1', 'term 2']
+    assert pytrend.proxy_pool.stats()['https://a:80']['quarantined_for'] == 0
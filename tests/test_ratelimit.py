@@ -0,0 +1,141 @@
+import time
+
+import pytest
+
+from pytrends import exceptions
+from pytrends.ratelimit import AdaptiveRateLimiter, RateLimiter, RedisRateLimiter, SQLiteRateLimiter
+from pytrends.request import TrendReq, BASE_TRENDS_URL
+
+
+def test_rate_limiter_waits_for_tokens():
+    limiter = RateLimiter(rate=20, burst=2)
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    # the first two requests go through as a burst, the other two wait 1/20 s each
+    assert time.monotonic() - start >= 0.09
+
+
+def test_rate_limiter_buckets_by_key():
+    limiter = RateLimiter(rate=0.001)
+    limiter.acquire('proxy1')
+    start = time.monotonic()
+    limiter.acquire('proxy2')
+    assert time.monotonic() - start < 0.5
+
+
+def test_rate_limiter_rejects_bad_rate():
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
+
+
+def test_adaptive_rate_limiter_aimd():
+    limiter = AdaptiveRateLimiter(rate=1, min_rate=0.3, max_rate=1.1, increase=0.1, decrease=0.5)
+    limiter.on_success('host')
+    assert limiter.current_rate('host') == pytest.approx(1.1)
+    limiter.on_success('host')
+    assert limiter.current_rate('host') == pytest.approx(1.1)
+    limiter.on_throttle('host')
+    assert limiter.current_rate('host') == pytest.approx(0.55)
+    limiter.on_throttle('host')
+    assert limiter.current_rate('host') == pytest.approx(0.3)
+    assert limiter.current_rate('other') == 1
+
+
+def test_get_data_reports_to_rate_limiter(mocked_responses):
+    mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    mocked_responses.add(
+        url=TrendReq.TRENDING_SEARCHES_URL,
+        method='GET',
+        json={'united_states': ['term 1', 'term 2']}
+    )
+    mocked_responses.add(url=TrendReq.TRENDING_SEARCHES_URL, method='GET', status=429)
+    limiter = AdaptiveRateLimiter(rate=10, max_rate=20, increase=1, decrease=0.5)
+    pytrend = TrendReq(rate_limiter=limiter)
+    pytrend.trending_searches()
+    assert limiter.current_rate('trends.google.com') == 11
+    with pytest.raises(exceptions.TooManyRequestsError):
+        pytrend.trending_searches()
+    assert limiter.current_rate('trends.google.com') == 5.5
+
+
+def test_sqlite_rate_limiter_is_shared(tmp_path):
+    path = str(tmp_path / 'ratelimit.sqlite')
+    first = SQLiteRateLimiter(path, rate=10)
+    second = SQLiteRateLimiter(path, rate=10)
+    start = time.monotonic()
+    first.acquire('proxy')
+    second.acquire('proxy')
+    first.acquire('proxy')
+    # the second and third requests wait for the budget shared through the database
+    assert time.monotonic() - start >= 0.19
+    start = time.monotonic()
+    second.acquire('other proxy')
+    assert time.monotonic() - start < 0.1
+
+
+def test_sqlite_rate_limiter_throttle(tmp_path):
+    limiter = SQLiteRateLimiter(str(tmp_path / 'ratelimit.sqlite'), rate=10, burst=5)
+    limiter.acquire('proxy')
+    limiter.on_throttle('proxy')
+    start = time.monotonic()
+    limiter.acquire('proxy')
+    assert time.monotonic() - start >= 0.09
+
+
+class FakeRedis:
+    """Implements the few Redis commands used by `RedisRateLimiter`"""
+
+    def __init__(self):
+        self.values = {}
+        self.expires = {}
+
+    def incr(self, name):
+        self.values[name] = self.values.get(name, 0) + 1
+        return self.values[name]
+
+    def expire(self, name, seconds):
+        self.expires[name] = seconds * 1000
+
+    def set(self, name, value, px=None):
+        self.values[name] = value
+        self.expires[name] = px
+
+    def pttl(self, name):
+        return self.expires.pop(name, -2) if name in self.values else -2
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Replaces `time.time` and `time.sleep`, sleeping moves the clock forward; yields the list of sleeps"""
+    clock = [100.25]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(time, 'time', lambda: clock[0])
+    monkeypatch.setattr(time, 'sleep', sleep)
+    yield sleeps
+
+
+def test_redis_rate_limiter_budget(fake_clock):
+    client = FakeRedis()
+    limiter = RedisRateLimiter(client, rate=2, window=1)
+    limiter.acquire('proxy')
+    limiter.acquire('proxy')
+    assert fake_clock == []
+    assert client.values['pytrends:proxy:100'] == 2
+    # the third request waits for the next window
+    limiter.acquire('proxy')
+    assert fake_clock == [pytest.approx(0.75)]
+    assert client.values['pytrends:proxy:101'] == 1
+
+
+def test_redis_rate_limiter_pauses_after_throttle(fake_clock):
+    client = FakeRedis()
+    limiter = RedisRateLimiter(client, rate=2, window=1, cooldown=30)
+    limiter.on_throttle('proxy')
+    limiter.acquire('proxy')
+    assert fake_clock == [30]
@@ -1,6 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime
+import json
 from unittest.mock import ANY
 import re
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
 
 import pandas as pd
 import numpy as np
@@ -8,6 +16,8 @@ import pytest
 import responses
 from pandas.testing import assert_frame_equal
 
+from pytrends.cache import SQLiteCache, TTLCache
+from pytrends.exceptions import DeadlineExceededError
 from pytrends.request import TrendReq, BASE_TRENDS_URL
 
 
@@ -299,6 +309,27 @@ def test_multirange_interest_over_time_same_keyword_ok():
     expected_result.assert_equals(df_result)
 
 
+@pytest.mark.vcr
+def test_multirange_interest_over_time_tidy():
+    pytrend = TrendReq()
+    pytrend.build_payload(kw_list=['pizza', 'bagel'], timeframe=['2021-01-01 2021-01-05', '2021-01-06 2021-01-10'])
+    df_result, averages = pytrend.multirange_interest_over_time(tidy=True)
+
+    assert len(df_result) == 10
+    assert_frame_equal(df_result.iloc[3:7].reset_index(drop=True), pd.DataFrame({
+        'range': [0, 0, 1, 1],
+        'keyword': ['pizza', 'pizza', 'bagel', 'bagel'],
+        'date': pd.to_datetime(['2021-01-04', '2021-01-05', '2021-01-06', '2021-01-07']),
+        'value': [49, 50, 1, 1],
+        'isPartial': [False, False, False, False],
+    }))
+    pd.testing.assert_series_equal(averages, pd.Series(
+        [72.0, 1.0],
+        index=pd.MultiIndex.from_tuples([(0, 'pizza'), (1, 'bagel')], names=['range', 'keyword']),
+        name='average',
+    ))
+
+
 @pytest.mark.vcr
 def test_interest_by_region_ok():
     pytrend = TrendReq()
@@ -652,3 +683,499 @@ def test_interest_over_time_multiple_regions():
     assert df[('pizza', 'US-IL')].notna().all()
     assert (df[('pizza', 'US-NY')] >= 0).all()
     assert (df[('pizza', 'US-IL')] >= 0).all()
+
+
+def test_session_is_reused(mocked_responses):
+    mocked_responses.add(
+        url=f'{BASE_TRENDS_URL}/explore/?geo=US',
+        method='GET',
+    )
+    mocked_responses.add(
+        url=TrendReq.TRENDING_SEARCHES_URL,
+        method='GET',
+        json={'united_states': ['term 1', 'term 2']}
+    )
+    with TrendReq(pool_maxsize=4) as pytrend:
+        session = pytrend._get_session()
+        pytrend.trending_searches()
+        pytrend.trending_searches()
+        assert pytrend._get_session() is session
+        assert session.get_adapter('https://')._pool_maxsize == 4
+    assert pytrend._sessions == {}
+
+
+def test_batch_interest_over_time(fake_trends):
+    dates = pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03'])
+    keywords = ['kw0', 'kw1', 'kw2', 'kw3', 'kw4', 'kw5', 'kw6']
+    fake = fake_trends({kw: [i, i * 2, i * 4] for i, kw in enumerate(keywords, start=1)}, dates)
+    pytrend = TrendReq()
+    df_result = pytrend.batch_interest_over_time(keywords + ['kw0'], max_workers=2, rate_limit=100)
+    assert fake.requests[TrendReq.GENERAL_URL] == 2
+    assert fake.requests[TrendReq.INTEREST_OVER_TIME_URL] == 2
+    assert list(df_result.columns) == keywords + ['isPartial']
+    # every payload is scaled on its own
+    assert df_result['kw4'].tolist() == [25, 50, 100]
+    assert df_result['kw5'].tolist() == [21, 43, 86]
+    assert df_result['isPartial'].tolist() == [False, False, True]
+
+
+def test_batch_interest_over_time_after_build_payload(fake_trends):
+    dates = pd.to_datetime(['2021-01-01', '2021-01-02'])
+    fake = fake_trends({'a': [1, 2], 'b': [2, 2], 'c': [3, 1]}, dates)
+    pytrend = TrendReq()
+    pytrend.build_payload(kw_list=['a'])
+    pytrend.batch_interest_over_time(['a', 'b'])
+    assert all(item['geo'] == '' for item in fake.items[-1])
+    # every keyword is compared in every region, up to five items per payload
+    df_result = pytrend.batch_interest_over_time(['a', 'b', 'c'], geo=['US', 'CA'])
+    # the payloads are sent concurrently, in any order
+    assert sorted([(item['keyword'], item['geo']) for item in items] for items in fake.items[-2:]) == [
+        [('a', 'US'), ('a', 'CA'), ('b', 'US'), ('b', 'CA')],
+        [('c', 'US'), ('c', 'CA')],
+    ]
+    assert df_result[('c', 'CA')].tolist() == [100, 33]
+    with pytest.raises(ValueError):
+        pytrend.batch_interest_over_time(['a', 'b'], geo=['US', 'CA'], anchor='c')
+
+
+def test_batch_interest_over_time_anchor(fake_trends):
+    dates = pd.to_datetime(['2021-01-01', '2021-01-02'])
+    volumes = {
+        'anchor': [10, 10],
+        'kw0': [5, 10], 'kw1': [10, 20], 'kw2': [20, 40], 'kw3': [50, 100],
+        'kw4': [250, 500], 'kw5': [25, 50],
+    }
+    fake = fake_trends(volumes, dates)
+    pytrend = TrendReq()
+    df_result = pytrend.batch_interest_over_time(
+        ['kw0', 'kw1', 'kw2', 'kw3', 'kw4', 'kw5'], anchor='anchor')
+    assert fake.requests[TrendReq.INTEREST_OVER_TIME_URL] == 2
+    assert list(df_result.columns) == ['kw0', 'kw1', 'kw2', 'kw3', 'kw4', 'kw5', 'anchor', 'isPartial']
+    # all the payloads share one scale, proportional to the raw volumes
+    assert df_result['kw4'].tolist() == [50, 100]
+    assert df_result['kw3'].tolist() == pytest.approx([10, 20])
+    assert df_result['kw5'].tolist() == pytest.approx([5, 10])
+    assert df_result['anchor'].tolist() == pytest.approx([2, 2])
+
+
+def test_refresh_interest_over_time(fake_trends):
+    dates = pd.date_range(end=pd.Timestamp.now(tz='UTC').normalize().tz_localize(None), periods=4)
+    fake = fake_trends({'pizza': [50, 100, 75, 25], 'bagel': [25, 25, 50, 50]}, dates)
+    pytrend = TrendReq()
+    pytrend.build_payload(kw_list=['pizza', 'bagel'], timeframe='today 3-m')
+    stored = build_interest_over_time_df({
+        'pizza': [40, 80, 10],
+        'bagel': [20, 20, 5],
+        'isPartial': [False, False, True],
+    }, dates=dates[:3])
+    df_result = pytrend.refresh_interest_over_time(stored)
+    # the new points are brought onto the scale of the stored ones
+    df_expected = build_interest_over_time_df({
+        'pizza': [40.0, 80.0, 60.0, 20.0],
+        'bagel': [20.0, 20.0, 40.0, 40.0],
+        'isPartial': [False, False, False, True],
+    }, dates=dates)
+    assert_frame_equal(df_result, df_expected, check_freq=False)
+    assert fake.requests[TrendReq.INTEREST_OVER_TIME_URL] == 1
+
+
+def test_refresh_interest_over_time_multiple_regions(fake_trends):
+    dates = pd.date_range(end=pd.Timestamp.now(tz='UTC').normalize().tz_localize(None), periods=4)
+    fake = fake_trends({'pizza': [50, 100, 75, 25]}, dates)
+    pytrend = TrendReq()
+    pytrend.build_payload(kw_list=['pizza'], timeframe='today 3-m', geo=['US', 'CA'])
+    stored = pytrend.interest_over_time()
+    stored = stored.iloc[:3].copy()
+    stored.iloc[-1, -1] = True
+    df_result = pytrend.refresh_interest_over_time(stored)
+    # a single refresh request, rescaled onto the stored values
+    assert fake.requests[TrendReq.INTEREST_OVER_TIME_URL] == 2
+    assert df_result[('pizza', 'CA')].tolist() == [50, 100, 75, 25]
+    assert df_result['isPartial'].iloc[:, 0].tolist() == [False, False, False, True]
+
+
+def test_refresh_interest_over_time_too_old(fake_trends):
+    dates = pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03'])
+    fake_trends({'pizza': [3, 1, 2]}, dates)
+    pytrend = TrendReq()
+    pytrend.build_payload(kw_list=['pizza'], timeframe='2021-01-01 2021-01-03')
+    stored = build_interest_over_time_df({'pizza': [1, 2, 3], 'isPartial': [False, False, True]},
+                                         dates=dates)
+    # no trailing timeframe covers 2021, the whole payload is requested again
+    df_result = pytrend.refresh_interest_over_time(stored)
+    assert df_result['pizza'].tolist() == [100, 33, 67]
+
+
+def test_iter_interest_over_time(fake_trends):
+    fake = fake_trends({'pizza': [3, 1, 2], 'bagel': [1, 1, 1], 'taco': [2, 4, 1]},
+                       pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03']))
+    pytrend = TrendReq()
+    payloads = iter([
+        {'kw_list': ['pizza', 'bagel'], 'geo': 'US'},
+        {'kw_list': ['taco'], 'timeframe': 'today 3-m'},
+    ])
+    results = pytrend.iter_interest_over_time(payloads, output='records')
+    payload, records = next(results)
+    assert payload == {'kw_list': ['pizza', 'bagel'], 'cat': 0, 'timeframe': 'today 5-y',
+                       'geo': 'US', 'gprop': ''}
+    assert [record['pizza'] for record in records] == [100, 33, 67]
+    payload, records = next(results)
+    assert payload['timeframe'] == 'today 3-m'
+    assert [record['taco'] for record in records] == [50, 100, 25]
+    assert list(results) == []
+    assert fake.requests[TrendReq.INTEREST_OVER_TIME_URL] == 2
+    # the payload of build_payload is left untouched
+    assert pytrend.kw_list == []
+
+
+def test_iter_interest_over_time_is_lazy(fake_trends):
+    fake = fake_trends({'pizza': [3, 1, 2]},
+                       pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03']))
+    pytrend = TrendReq()
+    payloads = ({'kw_list': ['pizza'], 'timeframe': f'today {months}-m'} for months in range(1, 100))
+    results = pytrend.iter_interest_over_time(payloads)
+    next(results)
+    results.close()
+    # the first payload and the one requested ahead of the consumer
+    assert fake.requests[TrendReq.INTEREST_OVER_TIME_URL] <= 2
+
+
+def test_token_cache_is_shared(fake_trends):
+    fake = fake_trends({'pizza': [1, 2], 'bagel': [2, 1]}, pd.to_datetime(['2021-01-01', '2021-01-02']))
+    cache = TTLCache(ttl=60)
+    first = TrendReq(token_cache=cache)
+    first.build_payload(kw_list=['pizza', 'bagel'])
+    first.interest_by_region_widget['request']['resolution'] = 'CITY'
+    second = TrendReq(token_cache=cache)
+    second.build_payload(kw_list=['pizza', 'bagel'])
+    assert fake.requests[TrendReq.GENERAL_URL] == 1
+    assert 'resolution' not in second.interest_by_region_widget['request']
+    second.build_payload(kw_list=['pizza'])
+    assert fake.requests[TrendReq.GENERAL_URL] == 2
+
+
+def test_build_query_is_stateless(fake_trends):
+    fake_trends({'pizza': [3, 1, 2], 'bagel': [1, 1, 1], 'taco': [2, 4, 1]},
+                pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03']))
+    pytrend = TrendReq()
+    queries = [pytrend.build_query(kw_list=['pizza', 'bagel']), pytrend.build_query(kw_list=['taco'])]
+    assert pytrend.kw_list == []
+    assert queries[1].kw_list == ('taco', )
+    # a single instance serves both queries at once
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda query: pytrend.interest_over_time(query=query), queries))
+    assert list(results[0].columns) == ['pizza', 'bagel', 'isPartial']
+    assert results[1]['taco'].tolist() == [50, 100, 25]
+    # build_payload returns its query too
+    query = pytrend.build_payload(kw_list=['taco'])
+    assert query.kw_list == ('taco', )
+    assert pytrend.kw_list == ['taco']
+
+
+def test_explore_all(fake_trends):
+    fake = fake_trends({'pizza': [3, 1, 2], 'bagel': [1, 1, 1]},
+                       pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03']))
+    pytrend = TrendReq()
+    pytrend.build_payload(kw_list=['pizza', 'bagel'])
+    result = pytrend.explore_all(output='records')
+    assert [record['pizza'] for record in result.interest_over_time] == [100, 33, 67]
+    assert result.interest_by_region == [{'geoName': 'United States', 'pizza': 100, 'bagel': 50}]
+    assert result.related_topics == {}
+    assert result.related_queries == {
+        kw: {'top': [{'query': f'{kw} near me', 'value': 100}],
+             'rising': [{'query': f'{kw} day', 'value': 250}]}
+        for kw in ['pizza', 'bagel']
+    }
+    # one request per widget and no new token request
+    assert fake.requests[TrendReq.GENERAL_URL] == 1
+    assert fake.requests[TrendReq.RELATED_QUERIES_URL] == 2
+    # nothing to request before a payload is built
+    assert TrendReq().explore_all() == (None, None, {}, {})
+
+
+def test_interest_by_region_leaves_widget_untouched(mocked_responses):
+    mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    mocked_responses.add(
+        url=TrendReq.INTEREST_BY_REGION_URL,
+        method='GET',
+        body=')]}\',\n' + json.dumps({'default': {'geoMapData': []}}),
+        content_type='application/json',
+    )
+    pytrend = TrendReq()
+    pytrend.kw_list = ['pizza']
+    pytrend.interest_by_region_widget = {'request': {'resolution': 'COUNTRY'}, 'token': 'token'}
+    pytrend.interest_by_region(resolution='CITY', inc_low_vol=True)
+    sent = json.loads(parse_qs(urlparse(mocked_responses.calls[-1].request.url).query)['req'][0])
+    assert sent == {'resolution': 'CITY', 'includeLowSearchVolumeGeos': True}
+    assert pytrend.interest_by_region_widget['request'] == {'resolution': 'COUNTRY'}
+
+
+def test_ttl_cache_expires():
+    now = [0]
+    cache = TTLCache(maxsize=2, ttl=10, timer=lambda: now[0])
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    # 'b' is the least recently used entry
+    assert cache.get('b') is None
+    now[0] = 10
+    assert cache.get('a') is None
+    assert len(cache) == 1
+
+
+def test_interest_over_time_dtype(fake_trends):
+    fake_trends({'pizza': [3, 1, 2], 'bagel': [1, 1, 1]},
+                pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03']))
+    pytrend = TrendReq()
+    pytrend.build_payload(kw_list=['pizza', 'bagel'])
+    df_result = pytrend.interest_over_time(dtype='uint8')
+    df_expected = build_interest_over_time_df({
+        'pizza': np.array([100, 33, 67], dtype='uint8'),
+        'bagel': np.array([33, 33, 33], dtype='uint8'),
+        'isPartial': [False, False, True],
+    }, dates=['2021-01-01', '2021-01-02', '2021-01-03'])
+    assert_frame_equal(df_result, df_expected)
+
+
+def test_interest_by_region_city_coordinates(mocked_responses):
+    mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    geo_map = [
+        {'coordinates': {'lat': 41.88, 'lng': -87.63}, 'geoName': 'Chicago', 'value': [80, 20]},
+        {'coordinates': {'lat': 40.71, 'lng': -74.01}, 'geoName': 'New York', 'value': [100, 40]},
+        {'coordinates': {'lat': 34.05, 'lng': -118.24}, 'geoName': 'Los Angeles', 'value': [70, 10]},
+    ]
+    mocked_responses.add(
+        url=TrendReq.INTEREST_BY_REGION_URL,
+        method='GET',
+        body=')]}\',\n' + json.dumps({'default': {'geoMapData': geo_map}}),
+        content_type='application/json',
+    )
+    pytrend = TrendReq()
+    pytrend.kw_list = ['pizza', 'bagel']
+    pytrend.interest_by_region_widget = {'request': {}, 'token': 'token'}
+    df_result = pytrend.interest_by_region(resolution='CITY', inc_geo_code=True, dtype='uint8')
+    df_expected = pd.DataFrame({
+        'lat': [41.88, 34.05, 40.71],
+        'lng': [-87.63, -118.24, -74.01],
+        'pizza': np.array([80, 70, 100], dtype='uint8'),
+        'bagel': np.array([20, 10, 40], dtype='uint8'),
+    }, index=pd.Index(['Chicago', 'Los Angeles', 'New York'], name='geoName'))
+    assert_frame_equal(df_result, df_expected)
+
+
+def test_interest_over_time_output(fake_trends):
+    fake_trends({'pizza': [3, 1, 2], 'bagel': [1, 1, 1]},
+                pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03']))
+    pytrend = TrendReq()
+    pytrend.build_payload(kw_list=['pizza', 'bagel'])
+    records = pytrend.interest_over_time(output='records')
+    assert records[0] == {
+        'date': datetime(2021, 1, 1), 'pizza': 100, 'bagel': 33, 'isPartial': False}
+    assert [record['pizza'] for record in records] == [100, 33, 67]
+    columns = pytrend.interest_over_time(dtype='uint8', output='numpy')
+    assert list(columns) == ['date', 'pizza', 'bagel', 'isPartial']
+    assert columns['pizza'].dtype == np.uint8
+    np.testing.assert_array_equal(columns['isPartial'], [False, False, True])
+    pa = pytest.importorskip('pyarrow')
+    table = pytrend.interest_over_time(output='arrow')
+    assert isinstance(table, pa.Table)
+    assert table.column('bagel').to_pylist() == [33, 33, 33]
+
+
+def test_related_queries_output(mocked_responses):
+    mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    ranked_list = [
+        {'rankedKeyword': [{'query': 'pizza hut', 'value': 100, 'link': '/'},
+                           {'query': 'pizza near me', 'value': 80, 'link': '/'}]},
+        {'rankedKeyword': [{'query': 'pizza day', 'value': 250, 'link': '/'}]},
+    ]
+    mocked_responses.add(
+        url=TrendReq.RELATED_QUERIES_URL,
+        method='GET',
+        body=')]}\',\n' + json.dumps({'default': {'rankedList': ranked_list}}),
+        content_type='application/json',
+    )
+    pytrend = TrendReq()
+    pytrend.related_queries_widget_list = [{
+        'request': {'restriction': {'complexKeywordsRestriction': {
+            'keyword': [{'type': 'BROAD', 'value': 'pizza'}]}}},
+        'token': 'token',
+    }]
+    result = pytrend.related_queries(output='records')
+    assert result == {'pizza': {
+        'top': [{'query': 'pizza hut', 'value': 100}, {'query': 'pizza near me', 'value': 80}],
+        'rising': [{'query': 'pizza day', 'value': 250}],
+    }}
+
+
+def test_suggestions_many(mocked_responses, tmp_path):
+    mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    topics = {
+        'pizza': [{'mid': '/m/0663v', 'title': 'Pizza', 'type': 'Dish'},
+                  {'mid': '/m/0dfxdnc', 'title': 'Pizza dough', 'type': 'Food'}],
+        'qwxzv': [],
+    }
+    for kw, kw_topics in topics.items():
+        mocked_responses.add(
+            url=TrendReq.SUGGESTIONS_URL + kw,
+            method='GET',
+            body=')]}\',\n' + json.dumps({'default': {'topics': kw_topics}}),
+            content_type='application/json',
+        )
+    pytrend = TrendReq(response_cache=SQLiteCache(str(tmp_path / 'cache.sqlite')))
+    df = pytrend.suggestions_many(['Pizza', ' pizza ', 'qwxzv', ''])
+    # the keywords are kept as given so the table can be joined back to them
+    assert df.to_dict('records') == [
+        {'keyword': 'Pizza', 'mid': '/m/0663v', 'title': 'Pizza', 'type': 'Dish'},
+        {'keyword': ' pizza ', 'mid': '/m/0663v', 'title': 'Pizza', 'type': 'Dish'},
+        {'keyword': 'qwxzv', 'mid': None, 'title': None, 'type': None},
+        {'keyword': '', 'mid': None, 'title': None, 'type': None},
+    ]
+    # every distinct keyword is requested once, and then served by the cache
+    records = pytrend.suggestions_many(['PIZZA', 'qwxzv'], limit=2, output='records')
+    assert [(record['keyword'], record['title']) for record in records] == [
+        ('PIZZA', 'Pizza'), ('PIZZA', 'Pizza dough'), ('qwxzv', None)]
+    assert len(mocked_responses.calls) == 3
+
+
+def test_unknown_output():
+    with pytest.raises(ValueError):
+        TrendReq().interest_over_time(output='polars')
+
+
+@pytest.mark.vcr
+def test_top_charts_output():
+    pytrend = TrendReq()
+    columns = pytrend.top_charts(date=2021, output='numpy')
+    assert columns['title'][:3].tolist() == ['Australia vs India', 'India vs England', 'IPL']
+    assert columns['exploreQuery'][5] == 'Copa America'
+
+
+def test_cookie_is_requested_once_per_proxy(mocked_responses):
+    cookie_request = mocked_responses.add(
+        url=f'{BASE_TRENDS_URL}/explore/?geo=US',
+        method='GET',
+        headers={'Set-Cookie': 'NID=511=abc; path=/; domain=.google.com'},
+    )
+    mocked_responses.add(
+        url=TrendReq.TRENDING_SEARCHES_URL,
+        method='GET',
+        json={'united_states': ['term 1', 'term 2']}
+    )
+    # building the client doesn't hit the network
+    pytrend = TrendReq(proxies=['https://a:80'])
+    assert cookie_request.call_count == 0
+    for _ in range(3):
+        pytrend.trending_searches()
+    assert cookie_request.call_count == 1
+    assert pytrend._cookie_jar['https://a:80'][0] == {'NID': '511=abc'}
+
+
+def test_cookie_is_requested_once_by_concurrent_requests(monkeypatch):
+    calls = []
+
+    def slow_cookie(self, proxy=''):
+        calls.append(proxy)
+        time.sleep(0.05)
+        return {'NID': '511=abc'}, time.time() + 60
+
+    monkeypatch.setattr(TrendReq, '_google_cookie', slow_cookie)
+    pytrend = TrendReq()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        cookies = list(executor.map(lambda _: pytrend._proxy_cookies(''), range(4)))
+    assert calls == ['']
+    assert cookies == [{'NID': '511=abc'}] * 4
+
+
+def test_cookie_is_refreshed_when_rejected(mocked_responses):
+    cookie_request = mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    mocked_responses.add(url=TrendReq.TRENDING_SEARCHES_URL, method='GET', status=403)
+    mocked_responses.add(
+        url=TrendReq.TRENDING_SEARCHES_URL,
+        method='GET',
+        json={'united_states': ['term 1', 'term 2']}
+    )
+    pytrend = TrendReq()
+    pytrend.trending_searches()
+    assert cookie_request.call_count == 2
+
+
+def test_cookie_expires(mocked_responses, monkeypatch):
+    cookie_request = mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    now = [1000.0]
+    monkeypatch.setattr('pytrends.request.time.time', lambda: now[0])
+    pytrend = TrendReq(cookie_ttl=60)
+    pytrend.GetGoogleCookie()
+    now[0] += 59
+    pytrend.GetGoogleCookie()
+    assert cookie_request.call_count == 1
+    now[0] += 1
+    pytrend.GetGoogleCookie()
+    assert cookie_request.call_count == 2
+
+
+def test_hedged_request(mocked_responses):
+    mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    release = threading.Event()
+    calls = []
+
+    def callback(request):
+        calls.append(request)
+        if len(calls) == 1:
+            # the first request hangs until the end of the test
+            release.wait(5)
+        return 200, {}, json.dumps({'united_states': [f'term {len(calls)}']})
+
+    mocked_responses.add_callback(
+        'GET', TrendReq.TRENDING_SEARCHES_URL, callback=callback, content_type='application/json')
+    pytrend = TrendReq(hedge_after=95)
+    pytrend._latencies.extend([0.01] * TrendReq.MIN_HEDGE_SAMPLES)
+    start = time.monotonic()
+    df_result = pytrend.trending_searches()
+    assert time.monotonic() - start < 1
+    # the duplicate answered first
+    assert df_result[0].tolist() == ['term 2']
+    release.set()
+
+
+def test_deadline(mocked_responses):
+    mocked_responses.add(url=f'{BASE_TRENDS_URL}/explore/?geo=US', method='GET')
+    release = threading.Event()
+
+    def callback(request):
+        release.wait(5)
+        return 200, {}, json.dumps({'united_states': []})
+
+    mocked_responses.add_callback(
+        'GET', TrendReq.TRENDING_SEARCHES_URL, callback=callback, content_type='application/json')
+    pytrend = TrendReq(deadline=0.2)
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        pytrend.trending_searches()
+    assert time.monotonic() - start < 1
+    release.set()
+
+
+def test_import_does_not_load_pandas():
+    code = 'import sys, pytrends.request; print("pandas" in sys.modules)'
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == 'False'
+
+
+def test_prewarm_fetches_cookie_in_background(mocked_responses):
+    cookie_request = mocked_responses.add(
+        url=f'{BASE_TRENDS_URL}/explore/?geo=US',
+        method='GET',
+        headers={'Set-Cookie': 'NID=511=abc; path=/; domain=.google.com'},
+    )
+    mocked_responses.add(
+        url=TrendReq.TRENDING_SEARCHES_URL,
+        method='GET',
+        json={'united_states': ['term 1', 'term 2']}
+    )
+    pytrend = TrendReq(prewarm=True)
+    pytrend._prewarm_thread.join()
+    assert cookie_request.call_count == 1
+    pytrend.trending_searches()
+    assert cookie_request.call_count == 1
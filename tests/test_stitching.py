@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_series_equal
+
+from pytrends import stitching
+from pytrends.request import TrendReq
+
+
+def test_plan_windows_daily():
+    timeframes = stitching.plan_windows('2020-01-01', '2021-12-31')
+    assert timeframes == [
+        '2020-01-01 2020-09-25',
+        '2020-08-27 2021-05-22',
+        '2021-04-23 2021-12-31',
+    ]
+
+
+def test_plan_windows_hourly():
+    timeframes = stitching.plan_windows('2021-01-01', '2021-01-10T12', granularity='hourly')
+    assert timeframes == [
+        '2021-01-01T00 2021-01-07T23',
+        '2021-01-07T00 2021-01-10T12',
+    ]
+
+
+def test_plan_windows_bad_arguments():
+    with pytest.raises(ValueError):
+        stitching.plan_windows('2021-01-01', '2021-02-01', granularity='weekly')
+    with pytest.raises(ValueError):
+        stitching.plan_windows('2021-01-01', '2021-02-01', overlap=pd.Timedelta(days=300))
+
+
+@pytest.fixture
+def fake_windows(monkeypatch):
+    """Serves windows of a known hourly series, each scaled by Google so that its highest value is 100"""
+    index = pd.date_range('2021-01-01', '2021-01-20T23', freq='H', name='date')
+    hours = np.arange(len(index))
+    series = pd.DataFrame({
+        'pizza': 50 + 40 * np.sin(hours / 24) + hours / 10,
+        'bagel': 20 + 10 * np.cos(hours / 12),
+    }, index=index)
+
+    def fake(self, payload, dtype='int64', output='pandas'):
+        start, stop = (pd.Timestamp(time.replace('T', ' ')) for time in payload['timeframe'].split(' '))
+        window = series.loc[start:stop]
+        window = window * (100 / window.to_numpy().max())
+        window['isPartial'] = False
+        return payload, window
+
+    monkeypatch.setattr(TrendReq, '_payload_interest_over_time', fake)
+    return series
+
+
+def test_get_stitched_data(fake_windows):
+    df = stitching.get_stitched_data(['pizza', 'bagel'], '2021-01-01', '2021-01-20T23',
+                                     granularity='hourly')
+    expected = fake_windows * (100 / fake_windows.to_numpy().max())
+    assert_series_equal(df['pizza'], expected['pizza'], check_freq=False)
+    assert_series_equal(df['bagel'], expected['bagel'], check_freq=False)
+    assert not df['isPartial'].any()